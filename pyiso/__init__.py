@@ -91,3 +91,30 @@ def client_factory(client_name, **kwargs):
     client_inst.NAME = client_name
 
     return client_inst
+
+
+def get_concurrently(ba_names, method_name, max_workers=8, **kwargs):
+    """
+    Call the same get_* method for several balancing authorities at once, one thread per client.
+
+    :param list ba_names: Balancing authority names, as accepted by client_factory.
+    :param str method_name: One of 'get_generation', 'get_load' or 'get_trade'.
+    :param int max_workers: Maximum number of clients fetching at the same time.
+    :return: Dict mapping each name in ba_names to its list of dicts.
+        If a client raises an error, it is logged and its value is an empty list.
+    :rtype: dict
+    """
+    from pyiso.base import concurrent_map
+
+    # the factory loads modules, so build clients before any threads start
+    clients = [client_factory(ba_name) for ba_name in ba_names]
+
+    def _get(client):
+        try:
+            return getattr(client, method_name)(**kwargs)
+        except Exception as e:
+            LOGGER.error('%s: %s failed with args %s: %s' % (client.NAME, method_name, kwargs, e))
+            return []
+
+    results = concurrent_map(_get, clients, max_workers=max_workers)
+    return dict(zip(ba_names, results))
@@ -1,20 +1,27 @@
+import copy
 import os
+import re
 import ssl
+import threading
 import warnings
 import zipfile
 from collections import namedtuple
 from datetime import datetime, timedelta
 from io import StringIO, BytesIO
+from multiprocessing.pool import ThreadPool
 from time import sleep
 
 import certifi
+import numpy as np
 import pandas as pd
 import pytz
 import requests
+from requests.adapters import HTTPAdapter
 from dateutil.parser import parse as dateutil_parse
-from pytz import AmbiguousTimeError
+from pytz import AmbiguousTimeError, NonExistentTimeError
 
 from pyiso import LOGGER
+from pyiso.cache import ResponseCache
 
 try:
     from urllib2 import urlopen
@@ -24,6 +31,9 @@ except ImportError:
 # named tuple for time period interval labels
 IntervalChoices = namedtuple('IntervalChoices', ['hourly', 'fivemin', 'tenmin', 'fifteenmin', 'na', 'dam'])
 
+# columns of repeated labels, stored as categoricals in columnar results
+CATEGORICAL_COLUMNS = ['ba_name', 'fuel_name', 'market', 'freq']
+
 # list of fuel choices
 FUEL_CHOICES = ['biogas', 'biomass', 'coal', 'geo', 'hydro',
                 'natgas', 'nonwind', 'nuclear', 'oil', 'other',
@@ -31,6 +41,41 @@ FUEL_CHOICES = ['biogas', 'biomass', 'coal', 'geo', 'hydro',
                 'solarth', 'thermal', 'wind', 'fossil', 'dual', 'ccgt']
 
 
+def concurrent_map(func, items, max_workers=4):
+    """
+    Apply func to every item using a pool of worker threads.
+
+    :param func: Callable taking a single item.
+    :param items: Iterable of items.
+    :param int max_workers: Maximum number of simultaneous calls. If 1 or less, items are processed serially.
+    :return: List of results, in the same order as items.
+    :rtype: list
+    """
+    items = list(items)
+    if max_workers is None or max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    pool = ThreadPool(min(max_workers, len(items)))
+    try:
+        return pool.map(func, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
+# worker threads for the get_*_async methods of every client, created on first use
+_async_pool = None
+_async_pool_lock = threading.Lock()
+
+
+def _get_async_pool():
+    global _async_pool
+    with _async_pool_lock:
+        if _async_pool is None:
+            _async_pool = ThreadPool(BaseClient.MAX_CONCURRENT_REQUESTS)
+    return _async_pool
+
+
 class BaseClient(object):
     """
     Base class for scraper/parser clients.
@@ -45,6 +90,19 @@ class BaseClient(object):
     # name
     NAME = ''
 
+    # max simultaneous requests made by request_many, also the number of pooled connections per host
+    MAX_CONCURRENT_REQUESTS = 4
+
+    # length of the time windows that iter_generation, iter_load and iter_trade request one at a time
+    ITER_WINDOW = timedelta(days=1)
+
+    # how long cached responses are reused, unless the URL matches CACHE_DATED_URLS
+    CACHE_EXPIRE_AFTER = timedelta(minutes=5)
+
+    # (regex with one group, strptime format, age) for report URLs containing a date;
+    # once the date is older than age, the document no longer changes and is cached until evicted
+    CACHE_DATED_URLS = []
+
     def __init__(self, timeout_seconds=30):
         # will hold query options
         self.options = {}
@@ -52,6 +110,9 @@ class BaseClient(object):
         # connection timeout
         self.timeout_seconds = timeout_seconds
 
+        # response cache, see enable_cache
+        self.cache = None
+
     def get_generation(self, latest=False, yesterday=False, start_at=False, end_at=False, **kwargs):
         """
         Scrape and parse generation fuel mix data.
@@ -124,6 +185,137 @@ class BaseClient(object):
         """
         warnings.warn('PyISO no longer supports the get_lmp method. See http://watttime.org/lmp.', DeprecationWarning)
 
+    def get_generation_async(self, **kwargs):
+        """
+        Run get_generation in a background thread, from a pool shared by all clients.
+        Takes the same arguments as get_generation.
+
+        :return: Pending result; call its ``get()`` method to wait for the list of dicts.
+        :rtype: multiprocessing.pool.AsyncResult
+        """
+        return self._call_async('get_generation', **kwargs)
+
+    def get_load_async(self, **kwargs):
+        """
+        Run get_load in a background thread, from a pool shared by all clients.
+        Takes the same arguments as get_load.
+
+        :return: Pending result; call its ``get()`` method to wait for the list of dicts.
+        :rtype: multiprocessing.pool.AsyncResult
+        """
+        return self._call_async('get_load', **kwargs)
+
+    def get_trade_async(self, **kwargs):
+        """
+        Run get_trade in a background thread, from a pool shared by all clients.
+        Takes the same arguments as get_trade.
+
+        :return: Pending result; call its ``get()`` method to wait for the list of dicts.
+        :rtype: multiprocessing.pool.AsyncResult
+        """
+        return self._call_async('get_trade', **kwargs)
+
+    def get_generation_frame(self, **kwargs):
+        """
+        Like get_generation, but returns the data as a DataFrame.
+        Takes the same arguments as get_generation.
+
+        :return: DataFrame with one row per data point and columns ``[timestamp, ba_name, freq, market, fuel_name, gen_MW]``.
+           ``ba_name``, ``freq``, ``market`` and ``fuel_name`` are categorical.
+           Call ``to_dict(orient='records')`` on it to get the list of dicts returned by get_generation.
+        :rtype: pandas.DataFrame
+        """
+        return self._get_frame('get_generation', **kwargs)
+
+    def get_load_frame(self, **kwargs):
+        """
+        Like get_load, but returns the data as a DataFrame.
+        Takes the same arguments as get_load.
+
+        :return: DataFrame with one row per data point and columns ``[timestamp, ba_name, freq, market, load_MW]``.
+           ``ba_name``, ``freq`` and ``market`` are categorical.
+           Call ``to_dict(orient='records')`` on it to get the list of dicts returned by get_load.
+        :rtype: pandas.DataFrame
+        """
+        return self._get_frame('get_load', **kwargs)
+
+    def get_trade_frame(self, **kwargs):
+        """
+        Like get_trade, but returns the data as a DataFrame.
+        Takes the same arguments as get_trade.
+
+        :return: DataFrame with one row per data point and columns ``[timestamp, ba_name, freq, market, net_exp_MW]``.
+           ``ba_name``, ``freq`` and ``market`` are categorical.
+           Call ``to_dict(orient='records')`` on it to get the list of dicts returned by get_trade.
+        :rtype: pandas.DataFrame
+        """
+        return self._get_frame('get_trade', **kwargs)
+
+    def _get_frame(self, method_name, **kwargs):
+        # the as_frame option lets clients that build results from a DataFrame skip the list of dicts
+        data = getattr(self, method_name)(as_frame=True, **kwargs)
+        if isinstance(data, pd.DataFrame):
+            return data
+        return self.records_to_frame(data)
+
+    def iter_generation(self, **kwargs):
+        """
+        Like get_generation, but yields the data in chunks as it is fetched,
+        so that long time ranges do not have to be held in memory at once.
+        Takes the same arguments as get_generation.
+
+        :return: Generator of lists of dicts, each with keys ``[timestamp, ba_name, freq, market, fuel_name, gen_MW]``.
+        """
+        return self._iter_windows('get_generation', **kwargs)
+
+    def iter_load(self, **kwargs):
+        """
+        Like get_load, but yields the data in chunks as it is fetched,
+        so that long time ranges do not have to be held in memory at once.
+        Takes the same arguments as get_load.
+
+        :return: Generator of lists of dicts, each with keys ``[timestamp, ba_name, freq, market, load_MW]``.
+        """
+        return self._iter_windows('get_load', **kwargs)
+
+    def iter_trade(self, **kwargs):
+        """
+        Like get_trade, but yields the data in chunks as it is fetched,
+        so that long time ranges do not have to be held in memory at once.
+        Takes the same arguments as get_trade.
+
+        :return: Generator of lists of dicts, each with keys ``[timestamp, ba_name, freq, market, net_exp_MW]``.
+        """
+        return self._iter_windows('get_trade', **kwargs)
+
+    def _iter_windows(self, method_name, start_at=None, end_at=None, **kwargs):
+        # without a time range there is only one chunk
+        if not (start_at and end_at) or kwargs.get('latest', False):
+            yield getattr(self, method_name)(start_at=start_at, end_at=end_at, **kwargs) or []
+            return
+
+        # request ITER_WINDOW at a time; windows share their end points, so drop repeats
+        start_at = self.utcify(start_at)
+        end_at = self.utcify(end_at)
+        window_start = start_at
+        while window_start < end_at:
+            window_end = min(window_start + self.ITER_WINDOW, end_at)
+            data = getattr(self, method_name)(start_at=window_start, end_at=window_end, **kwargs) or []
+            if window_start > start_at:
+                data = [d for d in data if d['timestamp'] > window_start]
+            if data:
+                yield data
+            window_start = window_end
+
+    def _call_async(self, method_name, **kwargs):
+        # query state lives in self.options, so each call works on its own shallow copy.
+        # the copies share this client's session and therefore its connection pools.
+        self.get_session()
+        client = copy.copy(self)
+        client.options = {}
+
+        return _get_async_pool().apply_async(getattr(client, method_name), kwds=kwargs)
+
     def handle_options(self, **kwargs):
         """
         Process and store keyword argument options.
@@ -223,17 +415,119 @@ class BaseClient(object):
         :return: The .xls document's content as a pandas object.
         :rtype: pandas.io.excel.ExcelFile
         """
+        # go through request() when caching, so that dated spreadsheets are not downloaded again
+        if self.get_cache() is not None:
+            response = self.request(url)
+            if response:
+                return pd.ExcelFile(BytesIO(response.content))
+
         # follow http://stackoverflow.com/questions/27835619/ssl-certificate-verify-failed-error
         context = ssl.create_default_context(cafile=certifi.where())
         socket = urlopen(url, context=context)
         xd = pd.ExcelFile(socket)
         return xd
 
-    def request(self, url, mode='get', retry_sec=5, retries_remaining=5, **kwargs):
+    def enable_cache(self, cache_dir, max_size_bytes=500 * 1024 * 1024):
+        """
+        Cache successful GET responses on disk.
+        The cache can also be enabled for every client by setting the PYISO_CACHE_DIR environment variable
+        (and optionally PYISO_CACHE_MAX_MB).
+
+        :param str cache_dir: Directory to store responses in. Can be shared between clients.
+        :param int max_size_bytes: Maximum size of the cache; least recently used responses are evicted beyond it.
+        """
+        self.cache = ResponseCache(cache_dir, max_size_bytes=max_size_bytes)
+
+    def get_cache(self):
+        """
+        Return this client's ResponseCache, or None if caching is not enabled.
+        """
+        if getattr(self, 'cache', None) is None and os.environ.get('PYISO_CACHE_DIR'):
+            max_mb = int(os.environ.get('PYISO_CACHE_MAX_MB', 500))
+            self.enable_cache(os.environ['PYISO_CACHE_DIR'], max_size_bytes=max_mb * 1024 * 1024)
+        return self.cache
+
+    def cache_expire_after(self, url):
+        """
+        :param str url: The fully-qualified request URL.
+        :return: How long to cache the response for the URL, or None to keep it until evicted.
+        :rtype: timedelta
+        """
+        for pattern, fmt, age in self.CACHE_DATED_URLS:
+            match = re.search(pattern, url)
+            if match:
+                try:
+                    url_date = datetime.strptime(match.group(1), fmt)
+                except ValueError:
+                    continue
+                if url_date + age < datetime.utcnow():
+                    return None
+        return self.CACHE_EXPIRE_AFTER
+
+    def cache_response(self, url, response, params=None):
+        """
+        Store a successful GET response in the cache, if caching is enabled.
+        Clients that request with defer_cache=True call this once they have checked the response body.
+
+        :param str url: The URL that was requested, without the query string.
+        :param requests.Response response: The response to store.
+        :param dict params: The query parameters of the request.
+        """
+        cache = self.get_cache()
+        if cache is None or not response or getattr(response, 'from_cache', False):
+            return
+        cache_url = self._cache_url(url, params)
+        cache.set(cache_url, response, expire_after=self.cache_expire_after(cache_url))
+
+    def _cache_url(self, url, params=None):
+        return requests.Request('get', url, params=params).prepare().url
+
+    def get_session(self):
+        """
+        Return this client's requests.Session, creating it if needed.
+        New sessions keep up to MAX_CONCURRENT_REQUESTS pooled connections per host.
+        """
+        try:
+            return getattr(self, 'session')
+        except AttributeError:
+            pass
+
+        session = requests.Session()
+        pool_size = max(self.MAX_CONCURRENT_REQUESTS, 1)
+        for prefix in ['http://', 'https://']:
+            session.mount(prefix, HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+        self.session = session
+        return session
+
+    def request_many(self, urls, mode='get', max_workers=None, **kwargs):
+        """
+        Get or post to several URLs concurrently, with the same kwargs for each.
+        Every request goes through request(), so errors and throttling are handled the same way.
+
+        :param list urls: The URLs to request.
+        :param string mode: 'get' or 'post'.
+        :param int max_workers: Maximum number of simultaneous requests.
+            Defaults to MAX_CONCURRENT_REQUESTS.
+        :return: List of responses (or None for failed requests), in the same order as urls.
+        :rtype: list
+        """
+        if max_workers is None:
+            max_workers = self.MAX_CONCURRENT_REQUESTS
+
+        # create the shared session before any worker needs it
+        self.get_session()
+
+        def _request(url):
+            return self.request(url, mode=mode, **kwargs)
+
+        return concurrent_map(_request, urls, max_workers=max_workers)
+
+    def request(self, url, mode='get', retry_sec=5, retries_remaining=5, defer_cache=False, **kwargs):
         """
         Get or post to a URL with the provided kwargs.
         Returns the response, or None if an error was encountered.
         If the mode is not 'get' or 'post', raises ValueError.
+        If defer_cache is True, a successful response is not cached until the caller passes it to cache_response.
         """
         # check args
         allowed_modes = ['get', 'post']
@@ -241,11 +535,16 @@ class BaseClient(object):
             raise ValueError('Invalid request mode %s' % mode)
 
         # check for session
-        try:
-            session = getattr(self, 'session')
-        except AttributeError:
-            self.session = requests.Session()
-            session = self.session
+        session = self.get_session()
+
+        # check for cached response
+        cache = self.get_cache() if mode == 'get' else None
+        if cache is not None:
+            cache_url = self._cache_url(url, kwargs.get('params'))
+            response = cache.get(cache_url)
+            if response is not None:
+                LOGGER.debug('%s: request success for %s, %s with cache hit %s' % (self.NAME, url, kwargs, True))
+                return response
 
         # carry out request
         try:
@@ -270,6 +569,8 @@ class BaseClient(object):
         if response.status_code == 200:
             # success
             LOGGER.debug('%s: request success for %s, %s with cache hit %s' % (self.NAME, url, kwargs, getattr(response, 'from_cache', None)))
+            if cache is not None and not defer_cache:
+                cache.set(cache_url, response, expire_after=self.cache_expire_after(cache_url))
 
         elif response.status_code == 429:
             if retries_remaining > 0:
@@ -279,7 +580,7 @@ class BaseClient(object):
                 retries_remaining -= 1
                 return self.request(url, mode=mode,
                                     retry_sec=retry_sec*2, retries_remaining=retries_remaining,
-                                    **kwargs)
+                                    defer_cache=defer_cache, **kwargs)
             else:
                 # exhausted retries
                 LOGGER.warn('%s: exhausted retries for %s, %s' % (self.NAME, url, kwargs))
@@ -326,22 +627,25 @@ class BaseClient(object):
         # return
         return unzipped
 
-    def parse_to_df(self, filelike, mode='csv', header_names=None, sheet_names=None, **kwargs):
+    def parse_to_df(self, filelike, mode='csv', header_names=None, sheet_names=None, dropna=True, **kwargs):
         """
         Parse a delimited or excel file from the provided content and return a DataFrame.
 
         Any extra kwargs are passed to the appropriate pandas parser;
         read the pandas docs for details.
         Recommended kwargs: skiprows, parse_cols, header.
+        For large csvs, also pass usecols and dtype so only the needed columns are read, without object columns.
 
         :param filelike: string-like or filelike object containing formatted data
         :paramtype: string or file
         :param string mode: Choose from 'csv' or 'xls'. Default 'csv'.
             If 'csv', kwargs are passed to pandas.read_csv.
+            The C parser is used unless the delimiter or other kwargs need the python parser.
         :param list header_names: List of strings to use as column names.
             If provided, this will override the header extracted by pandas.
         :param list sheet_names: List of strings for excel sheet names to read.
             Default is to concatenate all sheets.
+        :param bool dropna: If True (default), drop rows with any missing values.
         """
         # check mode
         allowed_modes = ['csv', 'xls']
@@ -354,13 +658,13 @@ class BaseClient(object):
             try:
                 filelike.closed
             except AttributeError:  # string, unicode, etc
-                try:
-                    filelike = BytesIO(filelike)  # This was changed from StringIO for Python 3.x
-                except TypeError:
+                if isinstance(filelike, bytes):
+                    filelike = BytesIO(filelike)  # shares the buffer, no copy
+                else:
                     filelike = StringIO(filelike)
 
             # read csv
-            kwargs['engine'] = 'python'
+            kwargs.setdefault('engine', self.csv_engine(**kwargs))
             df = pd.read_csv(filelike, **kwargs)
 
         # do xls
@@ -385,10 +689,27 @@ class BaseClient(object):
             df.columns = header_names
 
         # drop na
-        df = df.dropna()
+        if dropna:
+            df = df.dropna()
 
         return df
 
+    def csv_engine(self, **kwargs):
+        """
+        Choose the pandas.read_csv parser for the given kwargs.
+        The C parser handles single-character and whitespace delimiters;
+        regex delimiters, delimiter sniffing and skipfooter need the python parser.
+
+        :return: 'c' or 'python'
+        :rtype: str
+        """
+        delimiter = kwargs.get('delimiter', kwargs.get('sep', ','))
+        if delimiter is None or 'skipfooter' in kwargs:
+            return 'python'
+        if len(delimiter) > 1 and delimiter != r'\s+':
+            return 'python'
+        return 'c'
+
     def utcify_index(self, local_index, tz_name=None, tz_col=None):
         """
         Convert a DateTimeIndex to UTC.
@@ -396,6 +717,8 @@ class BaseClient(object):
         :param DateTimeIndex local_index: The local DateTimeIndex to be converted.
         :param string tz_name: If local_ts is naive, it is assumed to be in timezone tz.
             If tz is not provided, the client's default timezone is used.
+        :param tz_col: If provided, a list or Series of timezone names, one per index value.
+            Unknown timezone names fall back to tz_name.
         :return: DatetimeIndex in UTC.
         :rtype: DatetimeIndex
         """
@@ -405,45 +728,113 @@ class BaseClient(object):
 
         # use tz col if given
         if tz_col is not None:
-            # it seems like we shouldn't have to iterate, but all the smart ways aren't working
-            aware_utc_list = []
-            for i in range(len(local_index)):
+            # localize each distinct timezone in one call
+            local_index = pd.DatetimeIndex(local_index)
+            tz_values = np.asarray(tz_col)
+            utc_values = np.empty(len(local_index), dtype='datetime64[ns]')
+            for tz_key in pd.unique(tz_values):
+                in_group = tz_values == tz_key
                 try:
-                    aware_local_ts = pytz.timezone(tz_col[i]).localize(local_index[i])
-                except pytz.UnknownTimeZoneError:
-                    # fall back to local ts
-                    aware_local_ts = pytz.timezone(tz_name).localize(local_index[i])
+                    tz = pytz.timezone(tz_key)
+                except (pytz.UnknownTimeZoneError, AttributeError):
+                    # fall back to local tz
+                    tz = pytz.timezone(tz_name)
 
-                # utcify
-                aware_utc_ts = self.utcify(aware_local_ts)
-                aware_utc_list.append(aware_utc_ts)
+                # like pytz localize, treat ambiguous and nonexistent times as standard time
+                standard_time = np.zeros(in_group.sum(), dtype=bool)
+                aware_group = self._localize_is_dst(local_index[in_group], tz, standard_time)
+                utc_values[in_group] = aware_group.tz_convert('UTC').tz_localize(None).values
 
             # indexify
-            aware_utc_index = pd.DatetimeIndex(aware_utc_list)
+            aware_utc_index = pd.DatetimeIndex(utc_values).tz_localize('UTC')
 
         else:
-            # localize
-            try:
-                aware_local_index = local_index.tz_localize(tz_name)
-            except AmbiguousTimeError as e:
-                LOGGER.debug(e)
-                try:
-                    aware_local_index = local_index.tz_localize(tz_name, ambiguous='infer')
-                except AmbiguousTimeError:
-                    LOGGER.warn('Second DatetimeIndex localization fallback, assuming DST transition day.')
-                    dst_active_list = self._dst_active_hours_for_transition_day(local_dt_index=local_index)
-                    aware_local_index = local_index.tz_localize(tz_name, ambiguous=dst_active_list)
-            except TypeError as e:
-                # already aware
-                LOGGER.debug(e)
-                aware_local_index = local_index
-
-            # convert to utc
-            aware_utc_index = aware_local_index.tz_convert('UTC')
+            aware_utc_index = self._localize_index(local_index, tz_name).tz_convert('UTC')
 
         # return
         return aware_utc_index
 
+    def utcify_array(self, local_ts_list, tz_name=None, is_dst=None, fmt=None):
+        """
+        Convert many datetimes or datetime strings to UTC in one vectorized operation.
+
+        :param local_ts_list: List, array, Series or Index of datetimes or datetime strings.
+            Values should be either all naive or all aware.
+        :param string tz_name: Naive values are assumed to be in timezone tz.
+            If tz is not provided, the client's default timezone is used.
+        :param is_dst: If provided, a bool or list of bools explicitly setting daylight savings time for each value.
+            Otherwise ambiguous times are inferred from the order of the values, as in utcify_index.
+        :param string fmt: If provided, the strftime format of the strings. Parsing with a fixed format is much faster
+            than inferring it. Values parsed with a format are treated as naive.
+        :return: DatetimeIndex in UTC, in the same order as local_ts_list.
+        :rtype: DatetimeIndex
+        """
+        # set up tz
+        if tz_name is None:
+            tz_name = self.TZ_NAME
+
+        values = np.asarray(local_ts_list)
+        if len(values) == 0:
+            return pd.DatetimeIndex([], tz='UTC')
+
+        # parse
+        if fmt is not None:
+            local_index = pd.DatetimeIndex(pd.to_datetime(values, format=fmt))
+        else:
+            # the first value decides whether the values are naive or aware
+            try:
+                first_ts = dateutil_parse(values[0])
+            except (AttributeError, TypeError):  # already parsed
+                first_ts = pd.Timestamp(values[0])
+
+            if first_ts.tzinfo is not None:  # already aware
+                return pd.DatetimeIndex(pd.to_datetime(values, utc=True))
+            local_index = pd.DatetimeIndex(pd.to_datetime(values))
+
+        # localize and convert to utc
+        if is_dst is None:
+            aware_local_index = self._localize_index(local_index, tz_name)
+        else:
+            is_dst = np.zeros(len(local_index), dtype=bool) | np.asarray(is_dst, dtype=bool)
+            aware_local_index = self._localize_is_dst(local_index, pytz.timezone(tz_name), is_dst)
+        return aware_local_index.tz_convert('UTC')
+
+    def _localize_is_dst(self, local_index, tz, is_dst):
+        """
+        Localize a naive DatetimeIndex with a daylight savings flag per value, as pytz localize does:
+        ambiguous and nonexistent times both take the offset the flag selects.
+        """
+        try:
+            return local_index.tz_localize(tz, ambiguous=is_dst)
+        except (NonExistentTimeError, ValueError) as e:
+            # a spring forward time (newer pandas raises ValueError), which tz_localize rejects
+            LOGGER.debug(e)
+
+        aware_values = [pd.NaT if pd.isnull(local_ts) else tz.localize(local_ts.to_pydatetime(), is_dst=bool(dst))
+                        for local_ts, dst in zip(local_index, is_dst)]
+        return pd.DatetimeIndex(pd.to_datetime(aware_values, utc=True)).tz_convert(tz)
+
+    def _localize_index(self, local_index, tz_name):
+        """
+        Localize a naive DatetimeIndex, inferring DST for ambiguous times. Aware indexes are returned unchanged.
+        """
+        try:
+            aware_local_index = local_index.tz_localize(tz_name)
+        except AmbiguousTimeError as e:
+            LOGGER.debug(e)
+            try:
+                aware_local_index = local_index.tz_localize(tz_name, ambiguous='infer')
+            except AmbiguousTimeError:
+                LOGGER.warn('Second DatetimeIndex localization fallback, assuming DST transition day.')
+                dst_active_list = self._dst_active_hours_for_transition_day(local_dt_index=local_index)
+                aware_local_index = local_index.tz_localize(tz_name, ambiguous=dst_active_list)
+        except TypeError as e:
+            # already aware
+            LOGGER.debug(e)
+            aware_local_index = local_index
+
+        return aware_local_index
+
     def slice_times(self, df, options=None):
         if options is None:
             options = self.options
@@ -484,12 +875,68 @@ class BaseClient(object):
 
     def serialize_faster(self, df, extras={}, drop_index=False):
         """DF is a DataFrame with DateTimeIndex and columns fuel_type and gen_MW (or load_mW).
-        Index and columns are already properly named."""
+        Index and columns are already properly named.
+        If the as_frame option is set, returns the columnar result of serialize_frame instead of a list of dicts."""
+        if self.options.get('as_frame', False):
+            return self.serialize_frame(df, extras=extras, drop_index=drop_index)
+
         df = df.reset_index(drop=drop_index)
         for key in extras:
             df[key] = extras[key]
         return df.to_dict(orient='records')
 
+    def serialize_frame(self, df, extras={}, drop_index=False):
+        """
+        Columnar counterpart of serialize_faster.
+        Extras and repeated labels are stored as categorical columns rather than repeated in every row.
+
+        :return: DataFrame with one row per data point.
+        :rtype: pandas.DataFrame
+        """
+        df = df.reset_index(drop=drop_index)
+        for key in extras:
+            df[key] = pd.Categorical.from_codes(np.zeros(len(df), dtype='int8'), categories=[extras[key]])
+        return self._categorize(df)
+
+    def records_to_frame(self, data):
+        """
+        Convert a list of dicts, as returned by get_generation, get_load or get_trade, to a columnar DataFrame.
+
+        :param list data: List of dicts.
+        :return: DataFrame with one row per dict, with categorical label columns.
+        :rtype: pandas.DataFrame
+        """
+        return self._categorize(pd.DataFrame(list(data)))
+
+    def concat_frames(self, frames):
+        """
+        Concatenate columnar results, as returned by serialize_frame, into one DataFrame.
+        Label columns stay categorical, with the categories of all the frames.
+
+        :param list frames: DataFrames, possibly for different data types.
+        :return: DataFrame with the rows of every frame, in order.
+        :rtype: pandas.DataFrame
+        """
+        frames = [self._categorize(df) for df in frames]
+        if len(frames) == 0:
+            return pd.DataFrame()
+
+        # older pandas cannot concatenate categoricals whose categories differ
+        for col in CATEGORICAL_COLUMNS:
+            categories = pd.Index([])
+            for df in frames:
+                if col in df.columns:
+                    categories = pd.Index(categories.append(df[col].cat.categories).unique())
+            frames = [df.assign(**{col: df[col].cat.set_categories(categories)}) if col in df.columns else df
+                      for df in frames]
+        return self._categorize(pd.concat(frames, ignore_index=True))
+
+    def _categorize(self, df):
+        for col in CATEGORICAL_COLUMNS:
+            if col in df.columns and df[col].dtype.name != 'category':
+                df[col] = df[col].astype('category')
+        return df
+
     def local_now(self):
         """Returns a tz-aware datetime equal to the current moment, in the local timezone"""
         return pytz.utc.localize(datetime.utcnow()).astimezone(pytz.timezone(self.TZ_NAME))
@@ -11,6 +11,11 @@ class BPAClient(BaseClient):
 
     base_url = 'https://transmission.bpa.gov/business/operations/'
 
+    # year-to-date spreadsheets are complete once the year is over
+    CACHE_DATED_URLS = [
+        (r'WindGenTotalLoadYTD_(\d{4})\.xls$', '%Y', timedelta(days=367)),
+    ]
+
     fuels = {
         'Hydro': 'hydro',
         'Wind': 'wind',
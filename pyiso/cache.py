@@ -0,0 +1,125 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from datetime import timedelta
+
+from pyiso import LOGGER
+
+
+class ResponseCache(object):
+    """
+    On-disk cache of HTTP responses, one pickle file per request.
+    Each entry has its own time to live, or none for documents that never change.
+    When the cache grows past max_size_bytes, the least recently used entries are evicted.
+
+    Clients may also keep parsed arrays in cache_dir as .npy files. These count towards max_size_bytes
+    and are evicted the same way, so readers must touch them on use and cope with them disappearing.
+    """
+    # file types that make up the cache, for size accounting and eviction
+    ENTRY_SUFFIXES = ('.pickle', '.npy')
+
+    def __init__(self, cache_dir, max_size_bytes=500 * 1024 * 1024):
+        """
+        :param str cache_dir: Directory to store responses in. Created if it does not exist.
+        :param int max_size_bytes: Maximum total size of the stored responses.
+        """
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+    def key(self, url):
+        """
+        :param str url: The fully-qualified request URL, including any query string.
+        :return: The cache key for the URL.
+        :rtype: str
+        """
+        return hashlib.sha1(url.encode('utf8')).hexdigest()
+
+    def get(self, url):
+        """
+        :param str url: The fully-qualified request URL, including any query string.
+        :return: The cached response, or None if there is no unexpired entry for the URL.
+        :rtype: requests.Response
+        """
+        path = self._path(url)
+        try:
+            with open(path, 'rb') as f:
+                expires_at, response = pickle.load(f)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            # missing, including evicted by another thread, or partly written
+            return None
+        except (AttributeError, ImportError, IndexError, TypeError, ValueError):
+            # written by incompatible versions of requests or its dependencies
+            self._remove(path)
+            return None
+
+        if expires_at is not None and expires_at < time.time():
+            self._remove(path)
+            return None
+
+        # the modification time records the last use, for LRU eviction
+        try:
+            os.utime(path, None)
+        except OSError:
+            # evicted by another thread since it was read
+            pass
+        response.from_cache = True
+        return response
+
+    def set(self, url, response, expire_after=None):
+        """
+        :param str url: The fully-qualified request URL, including any query string.
+        :param requests.Response response: The response to store.
+        :param timedelta expire_after: How long the entry is valid for, or None to keep it until evicted.
+        """
+        if expire_after is not None and expire_after <= timedelta(0):
+            return
+
+        expires_at = None if expire_after is None else time.time() + expire_after.total_seconds()
+        path = self._path(url)
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((expires_at, response), f, protocol=pickle.HIGHEST_PROTOCOL)
+            if os.path.exists(path):
+                os.remove(path)
+            os.rename(tmp_path, path)
+        except (IOError, OSError) as e:
+            LOGGER.warn('Failed to cache response for %s: %s' % (url, e))
+            self._remove(tmp_path)
+            return
+
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits in max_size_bytes.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.ENTRY_SUFFIXES):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+            self._remove(os.path.join(self.cache_dir, name))
+            total_size -= size
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, self.key(url) + '.pickle')
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -1,14 +1,15 @@
-import copy
 import re
+from collections import OrderedDict
 from datetime import datetime, timedelta, time
 from io import BytesIO, StringIO
 
 import pandas as pd
 import pytz
 from bs4 import BeautifulSoup
+from lxml import etree
 
 from pyiso import LOGGER
-from pyiso.base import BaseClient
+from pyiso.base import BaseClient, concurrent_map
 
 
 class CAISOClient(BaseClient):
@@ -17,6 +18,8 @@ class CAISOClient(BaseClient):
 
     For information about the data sources,
     see http://www.caiso.com/Documents/InterfaceSpecifications-OASISv4_1_3.pdf
+
+    Pass ``oasis_format='csv'`` to any get_* method to download OASIS results as CSV instead of XML.
     """
     NAME = 'CAISO'
 
@@ -27,6 +30,38 @@ class CAISOClient(BaseClient):
     base_payload = {'version': 1}
     oasis_request_time_format = '%Y%m%dT%H:%M-0000'
 
+    # REPORT_DATA fields kept by parse_oasis_xml, lower case
+    oasis_fields = ['data_item', 'resource_name', 'renewable_type', 'interval_start_gmt', 'value']
+
+    # CSV result columns (resultformat=6) that hold the oasis_fields,
+    # in order of preference when a result has more than one column for a field
+    oasis_csv_columns = OrderedDict([
+        ('XML_DATA_ITEM', 'data_item'),
+        ('DATA_ITEM', 'data_item'),
+        ('RESOURCE_NAME', 'resource_name'),
+        ('TAC_AREA_NAME', 'resource_name'),
+        ('RENEWABLE_TYPE', 'renewable_type'),
+        ('INTERVALSTARTTIME_GMT', 'interval_start_gmt'),
+        ('INTERVAL_START_GMT', 'interval_start_gmt'),
+        ('MW', 'value'),
+        ('VALUE', 'value'),
+    ])
+
+    # result format for OASIS queries, 'xml' or 'csv'; can be overridden with the oasis_format option
+    oasis_format = 'xml'
+
+    # longest span OASIS accepts in a single query; longer queries are split into windows of this size
+    oasis_max_window = timedelta(days=31)
+
+    # windows fetched at the same time; OASIS throttles clients that send too many requests
+    oasis_max_concurrent_requests = 2
+
+    # day files and OASIS queries that ended over a day ago do not change
+    CACHE_DATED_URLS = [
+        (r'/(\d{8})_DailyRenewablesWatch\.txt$', '%Y%m%d', timedelta(days=2)),
+        (r'enddatetime=(\d{8})T', '%Y%m%d', timedelta(days=2)),
+    ]
+
     TZ_NAME = 'America/Los_Angeles'
 
     fuels = {
@@ -95,7 +130,7 @@ class CAISOClient(BaseClient):
 
         # construct and execute OASIS request
         payload = self.construct_oasis_payload('SLD_FCST')
-        oasis_data = self.fetch_oasis(payload=payload)
+        oasis_data = self.fetch_oasis_data(payload=payload)
 
         # parse data
         parsed_data = self.parse_oasis_demand_forecast(oasis_data)
@@ -127,7 +162,7 @@ class CAISOClient(BaseClient):
 
         # construct and execute OASIS request
         payload = self.construct_oasis_payload('ENE_SLRS')
-        oasis_data = self.fetch_oasis(payload=payload)
+        oasis_data = self.fetch_oasis_data(payload=payload)
 
         # parse data
         parsed_data = self.parse_oasis_slrs(oasis_data)
@@ -176,6 +211,8 @@ class CAISOClient(BaseClient):
             'startdatetime': (startdatetime).strftime(self.oasis_request_time_format),
             'enddatetime': (enddatetime).strftime(self.oasis_request_time_format),
         }
+        if self.options.get('oasis_format', self.oasis_format) == 'csv':
+            payload['resultformat'] = 6
         payload.update(self.base_payload)
         payload.update(kwargs)
 
@@ -203,93 +240,102 @@ class CAISOClient(BaseClient):
         # set up storage
         parsed_data = []
 
-        # collect data
+        # list every day file in the range
+        request_dates = []
         request_date = self.options['start_at'].astimezone(self.ca_tz).date()
         local_end_at = self.options['end_at'].astimezone(self.ca_tz).date()
         while request_date <= local_end_at:
-            # set up request
-            url_file = request_date.strftime('%Y%m%d_DailyRenewablesWatch.txt')
-            url = self.base_url_gen + url_file
+            request_dates.append(request_date)
+            request_date += timedelta(days=1)
+        urls = [self.base_url_gen + d.strftime('%Y%m%d_DailyRenewablesWatch.txt') for d in request_dates]
 
-            # carry out request
-            response = self.request(url)
+        # fetch all days concurrently, then parse in date order
+        responses = self.request_many(urls)
+        for request_date, response in zip(request_dates, responses):
             if not response:
-                request_date += timedelta(days=1)
                 continue
+            parsed_data += self.parse_daily_renewables_watch(response.text, request_date)
 
-            dst_error_text = 'The supplied DateTime represents an invalid time.  For example, when the clock is ' \
-                             'adjusted forward, any time in the period that is skipped is invalid.'
-            header_idx = 1
-            for part in [1, 2]:  # process both halves of page (i.e. two parts)
-                num_data_rows = 24
+        # return
+        return parsed_data
+
+    def parse_daily_renewables_watch(self, text, request_date):
+        """Parse both halves of one DailyRenewablesWatch day file into generation data points."""
+        # set up storage
+        parsed_data = []
 
-                # The day transitioning to daylight saving time adds extra erroneous lines of text.
-                if part == 1 and dst_error_text in response.text:
-                    num_data_rows = 29
+        dst_error_text = 'The supplied DateTime represents an invalid time.  For example, when the clock is ' \
+                         'adjusted forward, any time in the period that is skipped is invalid.'
+        header_idx = 1
+        for part in [1, 2]:  # process both halves of page (i.e. two parts)
+            num_data_rows = 24
 
-                df = self.parse_to_df(response.text, nrows=num_data_rows, header=header_idx, delimiter='\t+')
+            # The day transitioning to daylight saving time adds extra erroneous lines of text.
+            if part == 1 and dst_error_text in text:
+                num_data_rows = 29
 
-                # The day transitioning to daylight saving time has errors in part two of the file that need removal.
-                if part == 2:
-                    df = df[df.THERMAL.map(str) != '#VALUE!']
+            df = self.parse_to_df(text, nrows=num_data_rows, header=header_idx, delimiter='\t+')
 
-                # combine date with hours to index
-                try:
-                    indexed = self.set_dt_index(df, request_date, df['Hour'])
-                except Exception as e:
-                    LOGGER.error(e)
-                    continue
+            # The day transitioning to daylight saving time has errors in part two of the file that need removal.
+            if part == 2:
+                df = df[df.THERMAL.map(str) != '#VALUE!']
 
-                # original header is fuel names
-                indexed.rename(columns=self.fuels, inplace=True)
+            # combine date with hours to index
+            try:
+                indexed = self.set_dt_index(df, request_date, df['Hour'])
+            except Exception as e:
+                LOGGER.error(e)
+                continue
 
-                # remove non-fuel cols
-                fuel_cols = list(set(self.fuels.values()) & set(indexed.columns))
-                subsetted = indexed[fuel_cols]
+            # original header is fuel names
+            indexed.rename(columns=self.fuels, inplace=True)
 
-                # pivot
-                pivoted = self.unpivot(subsetted)
-                pivoted.rename(columns={'level_1': 'fuel_name', 0: 'gen_MW'}, inplace=True)
+            # remove non-fuel cols
+            fuel_cols = list(set(self.fuels.values()) & set(indexed.columns))
+            subsetted = indexed[fuel_cols]
 
-                # slice times
-                sliced = self.slice_times(pivoted)
+            # pivot
+            pivoted = self.unpivot(subsetted)
+            pivoted.rename(columns={'level_1': 'fuel_name', 0: 'gen_MW'}, inplace=True)
 
-                # store
-                parsed_data += self.serialize(sliced,
-                                      header=['timestamp', 'fuel_name', 'gen_MW'],
-                                      extras={'ba_name': self.NAME,
-                                              'market': self.MARKET_CHOICES.hourly,
-                                              'freq': self.FREQUENCY_CHOICES.hourly})
+            # slice times
+            sliced = self.slice_times(pivoted)
 
-                # If processing the first part, set the header index for second part.
-                if part == 1:
-                    header_idx = num_data_rows + 3
+            # store
+            parsed_data += self.serialize(sliced,
+                                          header=['timestamp', 'fuel_name', 'gen_MW'],
+                                          extras={'ba_name': self.NAME,
+                                                  'market': self.MARKET_CHOICES.hourly,
+                                                  'freq': self.FREQUENCY_CHOICES.hourly})
 
-            # finish day
-            request_date += timedelta(days=1)
+            # If processing the first part, set the header index for second part.
+            if part == 1:
+                header_idx = num_data_rows + 3
 
         # return
         return parsed_data
 
     def fetch_oasis(self, payload={}, return_all_files=False):
         """
-        Returns a list of report data elements, or an empty list if an error was encountered.
+        Returns a DataFrame of report data records (see parse_oasis_xml),
+        or an empty DataFrame if an error was encountered.
 
         If return_all_files=False, returns only the content from the first file in the .zip -
         this is the default behavior and was used in earlier versions of this function.
 
         If return_all_files=True, will return an array representing the content from each file.
-        """
-        # set up storage
-        raw_data = []
 
-        if return_all_files is True:
-            default_return_val = []
+        If the payload requests CSV results (resultformat=6), the raw CSV content is returned instead.
+        """
+        csv_mode = payload.get('resultformat', False) == 6
+        if csv_mode:
+            default_return_val = [] if return_all_files else ''
         else:
-            default_return_val = ''
+            default_return_val = [] if return_all_files else self.parse_oasis_xml(b'')
 
         # try get
-        response = self.request(self.base_url_oasis, params=payload)
+        # OASIS reports errors and throttling in successful responses, so they are cached only once checked
+        response = self.request(self.base_url_oasis, params=payload, defer_cache=True)
         if not response:
             return default_return_val
 
@@ -299,71 +345,189 @@ class CAISOClient(BaseClient):
         if not content:
             return default_return_val
 
-        # check xml content for errors
-        soup = BeautifulSoup(content[0], 'xml')
-        error = soup.find(['error', 'ERROR'])
-        if error:
-            code = error.find(['err_code', 'ERR_CODE'])
-            desc = error.find(['err_desc', 'ERR_DESC'])
-            msg = 'XML error for CAISO OASIS with payload %s: %s %s' % (payload, code, desc)
-            LOGGER.error(msg)
-            return default_return_val
-        # return xml or csv data
-        if payload.get('resultformat', False) == 6:
-            # If we requested CSV files
+        # errors are always reported as xml
+        if csv_mode:
+            error = content[0].lstrip().startswith(b'<')
+        else:
+            error = any(b'err_code>' in thisfile.lower() for thisfile in content)
+        if not error:
+            self.cache_response(self.base_url_oasis, response, params=payload)
+
+        # return csv or xml data
+        if csv_mode:
+            if error:
+                self.parse_oasis_xml(content[0], payload=payload)
+                return default_return_val
             if return_all_files:
                 return content
             else:
                 return content[0]
         else:
-            # Return XML content
             if return_all_files:
-                raw_data = [BeautifulSoup(thisfile, 'xml').find_all(['REPORT_DATA', 'report_data']) for thisfile in content]
-                return raw_data
+                return [self.parse_oasis_xml(thisfile, payload=payload) for thisfile in content]
             else:
-                raw_data = soup.find_all(['REPORT_DATA', 'report_data'])
-                return raw_data
+                return self.parse_oasis_xml(content[0], payload=payload)
+
+    def fetch_oasis_data(self, payload={}):
+        """
+        Returns a DataFrame of report data records for an OASIS query (see parse_oasis_xml),
+        whether the payload requests XML or CSV results.
+
+        Long queries are split into windows no longer than oasis_max_window,
+        which are fetched concurrently and stitched back together in time order.
+        """
+        def _fetch(window_payload):
+            oasis_data = self.fetch_oasis(payload=window_payload)
+            if window_payload.get('resultformat', False) == 6:
+                return self.parse_oasis_csv(oasis_data)
+            return oasis_data
+
+        window_payloads = self.split_oasis_payload(payload)
+        if len(window_payloads) == 1:
+            return _fetch(window_payloads[0])
+
+        pieces = concurrent_map(_fetch, window_payloads, max_workers=self.oasis_max_concurrent_requests)
+
+        # adjacent windows share an endpoint, so drop the records of each window
+        # up to the last timestamp of the windows before it
+        kept = []
+        last_timestamp = None
+        for piece in pieces:
+            if last_timestamp is not None:
+                piece = piece[piece['timestamp'] > last_timestamp]
+            if len(piece) > 0:
+                last_timestamp = piece['timestamp'].max()
+            kept.append(piece)
+        return pd.concat(kept, ignore_index=True)
+
+    def split_oasis_payload(self, payload):
+        """
+        Split an OASIS payload into payloads whose time windows are no longer than oasis_max_window.
+
+        :param dict payload: Payload with startdatetime and enddatetime in oasis_request_time_format.
+        :return: List of payloads in time order. The payload itself is returned if it needs no splitting.
+        :rtype: list
+        """
+        try:
+            start = datetime.strptime(payload['startdatetime'], self.oasis_request_time_format)
+            end = datetime.strptime(payload['enddatetime'], self.oasis_request_time_format)
+        except (KeyError, ValueError):
+            return [payload]
+
+        window_payloads = []
+        window_start = start
+        while True:
+            window_end = min(window_start + self.oasis_max_window, end)
+            window_payload = dict(payload)
+            window_payload['startdatetime'] = window_start.strftime(self.oasis_request_time_format)
+            window_payload['enddatetime'] = window_end.strftime(self.oasis_request_time_format)
+            window_payloads.append(window_payload)
+            if window_end >= end:
+                break
+            window_start = window_end
+
+        return window_payloads
+
+    def parse_oasis_csv(self, content):
+        """
+        Read an OASIS CSV result (resultformat=6) into the same columns as parse_oasis_xml.
+
+        :param content: CSV document as bytes or string.
+        :return: DataFrame with a column for each of oasis_fields, plus a UTC 'timestamp' column.
+        :rtype: pandas.DataFrame
+        """
+        if not isinstance(content, bytes):
+            content = content.encode('utf-8')
+        if not content.strip():
+            return self.parse_oasis_xml(b'')
+
+        # only read the preferred column for each of oasis_fields
+        header = content.split(b'\n', 1)[0].decode('utf-8').strip().split(',')
+        columns = {}
+        for col, field in self.oasis_csv_columns.items():
+            if col in header and field not in columns.values():
+                columns[col] = field
+        usecols = list(columns)
+        dtypes = dict((col, float if columns[col] == 'value' else object) for col in usecols)
+        df = pd.read_csv(BytesIO(content), usecols=usecols, dtype=dtypes)
+
+        df = df.rename(columns=columns).reindex(columns=self.oasis_fields)
+        df['timestamp'] = pd.to_datetime(df['interval_start_gmt'], utc=True)
+        return df
+
+    def parse_oasis_xml(self, content, payload=None):
+        """
+        Stream the REPORT_DATA records of an OASIS XML document into columns,
+        clearing each element once it has been read.
+
+        :param content: XML document as bytes or string.
+        :param dict payload: The query payload, only used for error messages.
+        :return: DataFrame with one row per record and a column for each of oasis_fields,
+            plus a UTC 'timestamp' column parsed from interval_start_gmt.
+            'value' is a float column.
+            If the document reports an error, it is logged and the DataFrame is empty.
+        :rtype: pandas.DataFrame
+        """
+        if not isinstance(content, bytes):
+            content = content.encode('utf-8')
+
+        columns = dict((field, []) for field in self.oasis_fields)
+        error = {}
+
+        if content:
+            for event, elem in etree.iterparse(BytesIO(content), events=('end',), recover=True):
+                tag = elem.tag.rsplit('}', 1)[-1].lower()
+                if tag == 'report_data':
+                    record = dict((child.tag.rsplit('}', 1)[-1].lower(), child.text) for child in elem)
+                    for field in self.oasis_fields:
+                        columns[field].append(record.get(field))
+
+                    # free this record and any already processed siblings
+                    elem.clear()
+                    while elem.getprevious() is not None:
+                        del elem.getparent()[0]
+                elif tag in ['err_code', 'err_desc']:
+                    error[tag] = elem.text
+
+        if error:
+            msg = 'XML error for CAISO OASIS with payload %s: %s %s' % (payload, error.get('err_code'),
+                                                                        error.get('err_desc'))
+            LOGGER.error(msg)
+            columns = dict((field, []) for field in self.oasis_fields)
+
+        df = pd.DataFrame(columns, columns=self.oasis_fields)
+        df['value'] = pd.to_numeric(df['value'], errors='coerce')
+        df['timestamp'] = pd.to_datetime(df['interval_start_gmt'], utc=True)
+        return df
 
     def parse_oasis_renewable(self, raw_data):
         """Parse raw data output of fetch_oasis for renewables."""
         # set up storage
-        preparsed_data = {}
         parsed_data = []
+        if len(raw_data) == 0:
+            return parsed_data
 
-        # extract values from xml
-
-        for raw_soup_dp in raw_data:
-            # set up storage for timestamp
-            ts = self.utcify(raw_soup_dp.find(['INTERVAL_START_GMT', 'interval_start_gmt']).string)
-            if ts not in preparsed_data:
-                preparsed_data[ts] = {'wind': 0, 'solar': 0}
-
-            # store generation value
-            try:
-                fuel_name = raw_soup_dp.find(['RENEWABLE_TYPE', 'renewable_type']).string.lower()
-                gen_MW = float(raw_soup_dp.find(['VALUE', 'value']).string)
-                preparsed_data[ts][fuel_name] += gen_MW
-            except TypeError:
-                LOGGER.error('Error in schema for CAISO OASIS result %s' % raw_soup_dp.prettify())
-                continue
+        # sum wind and solar values over trading hubs
+        fuels = raw_data['renewable_type'].str.lower()
+        known = fuels.isin(['wind', 'solar'])
+        if (~known).any():
+            LOGGER.error('Error in schema for CAISO OASIS result, unknown renewable types %s' %
+                         list(raw_data['renewable_type'][~known].unique()))
+        totals = raw_data[known].groupby([raw_data['timestamp'][known], fuels[known]])['value'].sum()
+        totals = totals.unstack().reindex(columns=['wind', 'solar']).fillna(0)
 
         # collect values into dps
         freq = self.options.get('freq', self.FREQUENCY_CHOICES.hourly)
         market = self.options.get('market', self.MARKET_CHOICES.hourly)
 
-        for ts, preparsed_dp in preparsed_data.items():
-            # set up base
-            base_parsed_dp = {'timestamp': ts,
-                              'freq': freq,
-                              'market': market,
-                              'gen_MW': 0, 'ba_name': self.NAME}
-
-            # collect data
+        for ts, row in totals.iterrows():
             for fuel_name in ['wind', 'solar']:
-                parsed_dp = copy.deepcopy(base_parsed_dp)
-                parsed_dp['fuel_name'] = fuel_name
-                parsed_dp['gen_MW'] += preparsed_dp[fuel_name]
-                parsed_data.append(parsed_dp)
+                parsed_data.append({'timestamp': ts,
+                                    'freq': freq,
+                                    'market': market,
+                                    'fuel_name': fuel_name,
+                                    'gen_MW': row[fuel_name],
+                                    'ba_name': self.NAME})
 
         # return
         return parsed_data
@@ -385,31 +549,16 @@ class CAISOClient(BaseClient):
         market = self.options.get('market', self.MARKET_CHOICES.fivemin)
 
         # set up storage
-        extracted_data = {}
         parsed_data = []
 
-        # extract values from xml
-        for raw_soup_dp in raw_data:
-            data_item = raw_soup_dp.find(['DATA_ITEM', 'data_item']).string
-            if data_item in data_items:
-                # parse timestamp
-                ts = self.utcify(raw_soup_dp.find(['INTERVAL_START_GMT', 'interval_start_gmt']).string)
-
-                # parse val
-                if data_item == 'ISO_TOT_IMP_MW':
-                    val = -float(raw_soup_dp.find(['VALUE', 'value']).string)
-                else:
-                    val = float(raw_soup_dp.find(['VALUE', 'value']).string)
-
-                # add to storage
-                try:
-                    extracted_data[ts] += val
-                except KeyError:
-                    extracted_data[ts] = val
+        # extract values, imports count as negative exports
+        selected = raw_data[raw_data['data_item'].isin(data_items)]
+        values = selected['value'].where(selected['data_item'] != 'ISO_TOT_IMP_MW', -selected['value'])
+        extracted_data = values.groupby(selected['timestamp']).sum().sort_index()
 
         # assemble data
-        for ts in sorted(extracted_data.keys()):
-            parsed_dp = {data_label: extracted_data[ts]}
+        for ts, val in extracted_data.items():
+            parsed_dp = {data_label: val}
             parsed_dp.update({'timestamp': ts, 'freq': freq, 'market': market, 'ba_name': self.NAME})
             if self.options['data'] == 'gen':
                 parsed_dp.update({'fuel_name': 'other'})
@@ -433,23 +582,15 @@ class CAISOClient(BaseClient):
         else:
             data_item_key = 'SYS_FCST_5MIN_MW'
 
-        # extract values from xml
-        for raw_soup_dp in raw_data:
-            if raw_soup_dp.find(['DATA_ITEM', 'data_item']).string == data_item_key and \
-                    raw_soup_dp.find(['RESOURCE_NAME', 'resource_name']).string == 'CA ISO-TAC':
-
-                # parse timestamp
-                ts = self.utcify(raw_soup_dp.find(['INTERVAL_START_GMT', 'interval_start_gmt']).string)
-
-                # set up base
-                parsed_dp = {'timestamp': ts,
-                             'freq': freq,
-                             'market': market,
-                             'ba_name': self.NAME}
-
-                # store generation value
-                parsed_dp['load_MW'] = float(raw_soup_dp.find(['VALUE', 'value']).string)
-                parsed_data.append(parsed_dp)
+        # extract values
+        selected = raw_data[(raw_data['data_item'] == data_item_key) &
+                            (raw_data['resource_name'] == 'CA ISO-TAC')]
+        for ts, val in zip(selected['timestamp'], selected['value']):
+            parsed_data.append({'timestamp': ts,
+                                'freq': freq,
+                                'market': market,
+                                'ba_name': self.NAME,
+                                'load_MW': val})
 
         # return
         return parsed_data
@@ -536,7 +677,7 @@ class CAISOClient(BaseClient):
 
         # get OASIS total gen data
         payload = self.construct_oasis_payload(queryname='ENE_SLRS', schedule='ALL')
-        oasis_data = self.fetch_oasis(payload=payload)
+        oasis_data = self.fetch_oasis_data(payload=payload)
 
         # parse OASIS data
         for dp in self.parse_oasis_slrs(oasis_data):
@@ -555,12 +696,12 @@ class CAISOClient(BaseClient):
 
         # get OASIS total gen data
         gen_payload = self.construct_oasis_payload(queryname='ENE_SLRS', schedule='ALL')
-        gen_oasis_data = self.fetch_oasis(payload=gen_payload)
+        gen_oasis_data = self.fetch_oasis_data(payload=gen_payload)
         gen_dps = self.parse_oasis_slrs(gen_oasis_data)
 
         # get OASIS renewable gen data
         ren_payload = self.construct_oasis_payload(queryname='SLD_REN_FCST')
-        ren_oasis_data = self.fetch_oasis(payload=ren_payload)
+        ren_oasis_data = self.fetch_oasis_data(payload=ren_payload)
         ren_dps = self.parse_oasis_renewable(ren_oasis_data)
 
         # set of times with both gen and renewable data
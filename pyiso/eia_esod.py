@@ -1,8 +1,9 @@
-from pyiso.base import BaseClient
+from pyiso.base import BaseClient, concurrent_map
+import copy
 import json
 from os import environ
-from dateutil.parser import parse as dateutil_parse
 from datetime import datetime, timedelta
+import pandas as pd
 import pytz
 from pyiso import LOGGER
 
@@ -19,18 +20,31 @@ class EIAClient(BaseClient):
     Full listing of BAs with time zones here:
     https://www.eia.gov/beta/realtime_grid/docs/UserGuideAndKnownIssues.pdf
 
+    Pass incremental=True to a get_* method to only request points newer than
+    the last ones this client returned for the same series (see high_water_marks).
+
     """
 
     NAME = 'EIA'
 
     base_url = 'http://api.eia.gov'
 
+    # format of hourly series timestamps, e.g. 20171122T05Z
+    series_time_format = '%Y%m%dT%HZ'
+
     fuels = {
         'Other': 'other',
     }
 
     FUEL_CHOICES = ['other']
 
+    # most series_ids the API returns from a single request
+    max_series_per_request = 100
+
+    # how far back a latest request for several series reaches; num=1 only applies to single series,
+    # and some BAs report with up to two days of delay
+    latest_window = timedelta(days=3)
+
     EIA_BAs = ['AEC', 'AECI', 'AESO', 'AVA', 'AZPS', 'BANC', 'BCTC',
                'BPAT', 'CISO', 'CFE', 'CHPD', 'CISO', 'CPLE', 'CPLW',
                'DEAA', 'DOPD', 'DUK', 'EEI', 'EPE', 'ERCO', 'FMPP',
@@ -57,6 +71,9 @@ class EIAClient(BaseClient):
 
         self.TZ_NAME = 'UTC'
 
+        # latest timestamp fetched for each series_id, for the incremental option
+        self.high_water_marks = {}
+
     def set_ba(self, bal_auth):
         if bal_auth in self.EIA_BAs:
             self.BA = bal_auth
@@ -122,6 +139,75 @@ class EIAClient(BaseClient):
             LOGGER.error('No results for %s' % self.BA)
             return []
 
+    def get_many(self, bas, data_types=('gen', 'load', 'trade'), latest=False, yesterday=False,
+                 start_at=False, end_at=False, **kwargs):
+        """
+        Get data for several BAs and data types at once.
+        Series of the same data type are requested together, up to max_series_per_request per request,
+        and the requests are made concurrently.
+        Combinations a BA does not support are logged and skipped.
+
+        :param list bas: EIA BA names.
+        :param list data_types: Any of 'gen', 'load' and 'trade'.
+        :return: DataFrame with one row per data point, with columns
+            ``[timestamp, ba_name, freq, market, fuel_name, gen_MW, load_MW, net_exp_MW]`` as available.
+            ``ba_name`` is categorical.
+        :rtype: pandas.DataFrame
+        """
+        # one client per BA and data type, each holding its own options and series_id
+        # and formatting its series as a DataFrame
+        kwargs['as_frame'] = True
+        batches = []
+        for data_type in data_types:
+            clients = []
+            for ba in bas:
+                client = copy.copy(self)
+                client.options = {}
+                try:
+                    client.set_ba(ba)
+                    client.handle_options(data=data_type, latest=latest, yesterday=yesterday,
+                                          start_at=start_at, end_at=end_at, **kwargs)
+                    client.handle_ba_limitations()
+                    client.format_url()
+                except ValueError as e:
+                    LOGGER.warn('Skipping %s %s: %s' % (ba, data_type, e))
+                    continue
+                clients.append(client)
+
+            for i in range(0, len(clients), self.max_series_per_request):
+                batches.append(clients[i:i + self.max_series_per_request])
+
+        def _fetch(clients):
+            series_ids = [client.series_id for client in clients]
+
+            # request the union of the clients' windows; format_result trims each series to its own
+            windows = [client.series_window() for client in clients]
+            starts = [start for start, _ in windows]
+            ends = [end for _, end in windows]
+            start = None if None in starts else min(starts)
+            end = None if None in ends else max(ends)
+
+            result = self.request(clients[0].series_url(series_ids, start=start, end=end))
+            if result is None:
+                LOGGER.error('No results for %s' % ', '.join(series_ids))
+                return []
+            result_json = json.loads(result.text)
+            series_by_id = dict((series['series_id'], series) for series in result_json.get('series', []))
+
+            frames = []
+            for client in clients:
+                if client.series_id not in series_by_id:
+                    LOGGER.error('No results for %s' % client.series_id)
+                    continue
+                frames.append(client.format_result({'request': result_json.get('request'),
+                                                    'series': [series_by_id[client.series_id]]}))
+            return frames
+
+        frames = []
+        for batch_frames in concurrent_map(_fetch, batches, max_workers=self.MAX_CONCURRENT_REQUESTS):
+            frames += batch_frames
+        return self.concat_frames(frames)
+
     def handle_options(self, **kwargs):
         """
         Process and store keyword argument options.
@@ -178,8 +264,45 @@ class EIAClient(BaseClient):
             raise ValueError('Data not currently supported for Canada and Mexico')
 
     def set_url(self, type, series_id_suffix):
-        url_format = '{base_url}/series/?api_key={api_key}&series_id=EBA.{ba}{suffix}'
-        self.url = url_format.format(base_url=self.base_url, api_key=self.auth, ba=self.BA, suffix=series_id_suffix)
+        self.series_id = 'EBA.{ba}{suffix}'.format(ba=self.BA, suffix=series_id_suffix)
+        start, end = self.series_window()
+        self.url = self.series_url([self.series_id], start=start, end=end)
+
+    def series_url(self, series_ids, start=None, end=None):
+        """
+        EIA API URL requesting one or more series, separated by semicolons.
+        If given, only points between the start and end datetimes (inclusive) are requested.
+        With the latest option, only the most recent point is requested for a single series,
+        and the points of the last latest_window for several series.
+        """
+        url_format = '{base_url}/series/?api_key={api_key}&series_id={series_ids}'
+        url = url_format.format(base_url=self.base_url, api_key=self.auth, series_ids=';'.join(series_ids))
+        if self.options.get('latest', False) and len(series_ids) > 1 and not start:
+            start = pytz.utc.localize(datetime.utcnow()) - self.latest_window
+        if start:
+            url += '&start=' + start.astimezone(pytz.utc).strftime(self.series_time_format)
+        if end:
+            url += '&end=' + end.astimezone(pytz.utc).strftime(self.series_time_format)
+        if self.options.get('latest', False) and len(series_ids) == 1:
+            url += '&num=1'
+        return url
+
+    def series_window(self):
+        """
+        The start and end datetimes of the points to request for this client's series, or None where unbounded.
+        With the incremental option, the start is moved past the series' high water mark.
+        """
+        start, end = None, None
+        if self.options.get('latest', False):
+            return start, end
+        if self.options.get('start_at', None) and self.options.get('end_at', None):
+            start, end = self.options['start_at'], self.options['end_at']
+
+        high_water_mark = self.high_water_marks.get(self.series_id) if self.options.get('incremental') else None
+        if high_water_mark is not None:
+            next_point = high_water_mark + timedelta(hours=1)
+            start = max(start, next_point) if start else next_point
+        return start, end
 
     def format_url(self):
         """Set EIA API URL based on options"""
@@ -207,18 +330,6 @@ class EIAClient(BaseClient):
             else:
                 self.set_url('series', '-ALL.TI.H')
 
-    def format_data(self, data):
-        """Convert load data to int, handle None"""
-        if data is None:
-            return 0
-        else:
-            return int(data)
-
-    def add_gen_data(self, data_list):
-        for i in data_list:
-            i['fuel_name'] = 'other'
-        return data_list
-
     def _set_market(self):
         if self.options['forecast']:
             mkt = 'DAHR'
@@ -235,66 +346,63 @@ class EIAClient(BaseClient):
             data_type = 'load_MW'
         return data_type
 
-    def _format_list(self, data, timestamp, d_type, mkt):
-        pyiso_format = {
-                        'ba_name': self.BA,
-                        'timestamp': timestamp,
-                        'freq': self.options['freq'],
-                        d_type: data,
-                        'market': mkt
-                    }
-        return pyiso_format
-
-    def _format_latest(self, data, d_type, mkt):
-        formatted_list = []
-        last_datapoint = data['series'][0]['data'][0]
-        timestamp = self.utcify(dateutil_parse(last_datapoint[0]))
-        data = self.format_data(last_datapoint[1])
-        formatted = self._format_list(data, timestamp, d_type, mkt)
-        formatted_list.append(formatted)  # will be just one
-        return formatted_list
-
-    def _format_yesterday(self, data, d_type, mkt):
-        formatted_list = []
-        yesterday = self.local_now() - timedelta(days=1)
+    def _format_general(self, data):
+        """All series as one DataFrame of values, indexed by UTC timestamp, in the order the API returned them"""
+        timestamps = []
+        values = []
         for i in data['series']:
-            for j in i['data']:
-                timestamp = self.utcify(dateutil_parse(j[0]))
-                data = self.format_data(j[1])
-                if timestamp.year == yesterday.year and \
-                   timestamp.month == yesterday.month and \
-                   timestamp.day == yesterday.day:
-                    formatted = self._format_list(data, timestamp, d_type, mkt)
-                    formatted_list.append(formatted)
-        return formatted_list
-
-    def _format_general(self, data, d_type, mkt):
-        formatted_list = []
-        for i in data['series']:
-            for j in i['data']:
-                timestamp = self.utcify(dateutil_parse(j[0]))
-                data = self.format_data(j[1])
-                formatted = self._format_list(data, timestamp, d_type, mkt)
-                formatted_list.append(formatted)
-        return formatted_list
-
-    def _format_start_end(self, data):
-        formatted_sliced = []
-        if 'gen' not in self.options['data']:
-            formatted_sliced = [i for i in data if i['timestamp'] >= self.options['start_at'] and i['timestamp'] <= self.options['end_at']]
-        else:
+            timestamps += [j[0] for j in i['data']]
+            values += [j[1] for j in i['data']]
+
+        index = self.utcify_array(timestamps, tz_name='UTC', fmt=self.series_time_format)
+        index.name = 'timestamp'
+        # missing values are reported as zero
+        values = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').fillna(0).astype('int64')
+        return pd.DataFrame({'value': values.values}, index=index)
+
+    def _format_latest(self, df):
+        return df.iloc[:1]
+
+    def _format_yesterday(self, df):
+        yesterday = (self.local_now() - timedelta(days=1)).date()
+        return df[df.index.date == yesterday]
+
+    def _format_start_end(self, df):
+        if 'gen' in self.options['data']:
             try:
                 yesterday = (self.local_now() - timedelta(days=2)).replace(hour=0, minute=0,
                                                                            second=0, microsecond=0)
                 tomorrow = (self.local_now() + timedelta(days=1)).replace(hour=23, minute=0,
                                                                           second=0, microsecond=0)
                 assert ((self.options['start_at'] >= yesterday) and (self.options['end_at'] <= tomorrow))
-                formatted_sliced = [i for i in data if i['timestamp'] >= self.options['start_at'] and i['timestamp'] <= self.options['end_at']]
             except:
                 LOGGER.error('Generation data error for %s' % self.BA)
                 raise ValueError('Generation data is available for the \
                                  previous and current day.', self.options)
-        return formatted_sliced
+
+        # series are sorted, newest first, so the range is a contiguous block found by binary search
+        index = df.index
+        if index.is_monotonic_decreasing:
+            n_rows = len(index)
+            reversed_index = index[::-1]
+            first = n_rows - reversed_index.searchsorted(self.options['end_at'], side='right')
+            last = n_rows - reversed_index.searchsorted(self.options['start_at'], side='left')
+            return df.iloc[first:last]
+        elif index.is_monotonic_increasing:
+            first = index.searchsorted(self.options['start_at'], side='left')
+            last = index.searchsorted(self.options['end_at'], side='right')
+            return df.iloc[first:last]
+        else:
+            return df[(index >= self.options['start_at']) & (index <= self.options['end_at'])]
+
+    def _format_incremental(self, df):
+        """Drop points at or before the series' high water mark, then advance the mark"""
+        high_water_mark = self.high_water_marks.get(self.series_id)
+        if high_water_mark is not None:
+            df = df[df.index > high_water_mark]
+        if len(df) > 0:
+            self.high_water_marks[self.series_id] = df.index.max()
+        return df
 
     def format_result(self, data):
         """Output EIA API results in pyiso format"""
@@ -305,16 +413,24 @@ class EIAClient(BaseClient):
             raise ValueError('Query error for %s:' % data['request'])
         market = self._set_market()
         data_type = self._set_data_type()
-        data_formatted = []
+
+        df = self._format_general(data)
         if self.options['latest']:
-            data_formatted = self._format_latest(data, data_type, market)
+            df = self._format_latest(df)
         elif self.options['yesterday']:
-            data_formatted = self._format_yesterday(data, data_type, market)
-        else:
-            data_formatted = self._format_general(data, data_type, market)
+            df = self._format_yesterday(df)
 
         if self.options['start_at'] and self.options['end_at']:
-            data_formatted = self._format_start_end(data_formatted)
+            df = self._format_start_end(df)
+
+        if self.options.get('incremental', False):
+            df = self._format_incremental(df)
+
+        extras = {
+            'ba_name': self.BA,
+            'freq': self.options['freq'],
+            'market': market,
+        }
         if self.options['data'] == 'gen':
-            data_formatted = self.add_gen_data(data_formatted)
-        return data_formatted
+            extras['fuel_name'] = 'other'
+        return self.serialize_faster(df.rename(columns={'value': data_type}), extras=extras)
@@ -111,13 +111,11 @@ class ERCOTClient(BaseClient):
                 return []
 
             # convert column of hour ending (1:00-24:00) to hour beginning (0:00-23:00)
-            df['HourBeginning'] = df.apply(lambda dp: int(dp['HourEnding'].split(':')[0])-1,
-                                           axis=1)
+            df['HourBeginning'] = df['HourEnding'].str.split(':').str[0].astype(int) - 1
 
             # create datetime index of hour beginning
-            df.index = df.apply(lambda dp: self.utcify(pd.to_datetime('%s %d:00' % (dp['DeliveryDate'], dp['HourBeginning'])),
-                                                       is_dst=self.is_dst(dp['DSTFlag'], 'N')),
-                                axis=1)
+            local_ts_strs = df['DeliveryDate'] + ' ' + df['HourBeginning'].astype(str) + ':00'
+            df.index = self.utcify_array(local_ts_strs, is_dst=self.is_dst(df['DSTFlag'], 'N'))
 
             # slice times
             sliced = self.slice_times(df)
@@ -1,5 +1,6 @@
+import copy
 import time
-from pyiso.base import BaseClient
+from pyiso.base import BaseClient, concurrent_map
 from pyiso import LOGGER
 import requests
 import pandas as pd
@@ -187,6 +188,12 @@ class EUClient(BaseClient):
             'gen_freq': '30m', 'gen_market': 'RT5M'},
         }
 
+    # longest span ENTSO-E accepts in a single query; longer queries are split into windows of this size
+    entsoe_max_window = timedelta(days=365)
+
+    # windows fetched at the same time; the API limits the request rate per security token
+    entsoe_max_concurrent_requests = 2
+
     fuels = {
         'B01': 'biomass',    # Biomass
         'B02': 'coal',       # Brown coal/Lignite
@@ -216,16 +223,49 @@ class EUClient(BaseClient):
         self.handle_options(data='load', start_at=start_at, end_at=end_at, forecast=forecast,
                             latest=latest, control_area=control_area, **kwargs)
 
-        response = self.fetch_entsoe()
-        return self.parse_response(response)
+        return self.parse_windows(self.fetch_entsoe_windows())
 
     def get_generation(self, control_area=None, latest=False, yesterday=False, start_at=False, 
                        end_at=False, forecast=False, **kwargs):
         self.handle_options(data='gen', start_at=start_at, end_at=end_at, yesterday=yesterday, 
                             latest=latest, control_area=control_area, forecast=False, **kwargs)
 
-        response = self.fetch_entsoe()
-        return self.parse_response(response)
+        return self.parse_windows(self.fetch_entsoe_windows())
+
+    def get_many(self, control_areas, data_types=('gen', 'load'), latest=False, yesterday=False,
+                 start_at=None, end_at=None, forecast=False, **kwargs):
+        """
+        Get data for several control areas and data types at once, fetching the areas concurrently.
+        Unknown control areas are logged and skipped.
+
+        :param list control_areas: Keys of CONTROL_AREAS.
+        :param list data_types: Any of 'gen' and 'load'.
+        :return: DataFrame with one row per data point, with columns
+            ``[timestamp, ba_name, freq, market, fuel_name, gen_MW, load_MW]`` as available.
+            ``ba_name`` is the control area, and is categorical.
+        :rtype: pandas.DataFrame
+        """
+        # options are handled once per data type, then copied for each area
+        # each area's data is kept as a DataFrame
+        kwargs['as_frame'] = True
+        clients = []
+        for data_type in data_types:
+            template = copy.copy(self)
+            template.options = {}
+            template.handle_options(data=data_type, start_at=start_at, end_at=end_at, yesterday=yesterday,
+                                    latest=latest, forecast=forecast and data_type == 'load', **kwargs)
+            for control_area in control_areas:
+                if control_area not in self.CONTROL_AREAS:
+                    LOGGER.warn('Skipping unknown control area %s' % control_area)
+                    continue
+                client = copy.copy(template)
+                client.options = dict(template.options, control_area=control_area)
+                clients.append(client)
+
+        def _get(client):
+            return client.parse_windows(client.fetch_entsoe_windows())
+
+        return self.concat_frames(concurrent_map(_get, clients, max_workers=self.MAX_CONCURRENT_REQUESTS))
 
     def handle_options(self, **kwargs):
         # regular handle options
@@ -240,14 +280,45 @@ class EUClient(BaseClient):
         if 'forecast' in kwargs and kwargs['forecast']:
             self.options['forecast'] = True
 
-    def fetch_entsoe(self):
+    def fetch_entsoe_windows(self):
+        """
+        Fetch the start_at..end_at period in windows of at most entsoe_max_window, concurrently.
+
+        :return: List of XML responses (or None for failed requests), in time order.
+        :rtype: list
+        """
+        start_at, end_at = self.options['start_at'], self.options['end_at']
+        if start_at > end_at:
+            LOGGER.error('No ENTSO-E query for %s: start_at %s is after end_at %s' %
+                         (self.options['control_area'], start_at, end_at))
+            return []
+
+        # a zero length period is still one query
+        windows = []
+        window_start = start_at
+        while True:
+            window_end = min(window_start + self.entsoe_max_window, end_at)
+            windows.append((window_start, window_end))
+            if window_end >= end_at:
+                break
+            window_start = window_end
+
+        def _fetch(window):
+            return self.fetch_entsoe(start_at=window[0], end_at=window[1])
+
+        return concurrent_map(_fetch, windows, max_workers=self.entsoe_max_concurrent_requests)
+
+    def fetch_entsoe(self, start_at=None, end_at=None):
+        """
+        Fetch one query from the API, for start_at..end_at if given, otherwise for the period in the options.
+        """
         payload = {
             'securityToken': environ['ENTSOe_SECURITY_TOKEN']
         }
 
         format_str = "%Y%m%d%H00"
-        date_from = self.options['start_at'].strftime(format_str)
-        date_to = self.options['end_at'].strftime(format_str)
+        date_from = (start_at or self.options['start_at']).strftime(format_str)
+        date_to = (end_at or self.options['end_at']).strftime(format_str)
 
         TSO_ID = self.get_tso_id()
 
@@ -275,46 +346,108 @@ class EUClient(BaseClient):
         })
 
         r = self.request(self.base_url, params=payload)
+        if r is None:
+            return None
         # For some reason lxml gets pernikity about the XML with a header.
         return r.text.encode('ascii')
 
+    def parse_windows(self, responses):
+        """
+        Parse and merge the responses of fetch_entsoe_windows,
+        dropping the repeated points where windows meet.
+        Returns a list of dicts, or a DataFrame if the as_frame option is set.
+        """
+        frames = []
+        last_timestamp = None
+        for response in responses:
+            if response is None:
+                continue
+            df = self.parse_frame(response)
+            # windows are in time order, so anything up to the end of the previous window is a repeat
+            if last_timestamp is not None:
+                df = df[df['timestamp'] > last_timestamp]
+            if len(df) > 0:
+                last_timestamp = df['timestamp'].max()
+            frames.append(df)
+
+        if len(frames) == 0:
+            df = self.parse_frame(None)
+        else:
+            df = pd.concat(frames, ignore_index=True)
+        return self.serialize_faster(df, extras=self.response_extras(), drop_index=True)
+
     def parse_response(self, response):
         """
         Take the XML repsonse, pull out the required components
         and return a list of dicts containing the data requested
+        (or a DataFrame if the as_frame option is set)
+        """
+        return self.serialize_faster(self.parse_frame(response), extras=self.response_extras(), drop_index=True)
+
+    def response_extras(self):
+        """
+        The values shared by every point of a response.
         """
-        data = []
-        xmldoc = objectify.fromstring(response)
-        for ts in xmldoc.TimeSeries:
-            for period in ts.Period:
-                initialOffset = self.utcify(period.timeInterval.start.text)
-                resolution = self.parse_resolution(period.resolution.text)
-                if self.options['latest']:
-                  points = [ period.Point[-1] ]
-                else:
-                  points = period.Point
-                for point in points:
-                    if int(point.quantity.text) == 0:
-                      continue
-                    timestamp = initialOffset + resolution * point.position
-                    datapoint = {
-                        'ba_name': self.options['control_area'],
-                        'market': 'RTHR',
-                        'timestamp': timestamp,
-                        'freq': 'n/a',
-                    }
-                    if (self.options['forecast']):
-                        datapoint['market'] = 'DAM'
-                    if self.options['data'] == 'gen':
-                      datapoint['market'] = self.CONTROL_AREAS[self.options['control_area']]['gen_market']
-                      datapoint['freq'] = self.CONTROL_AREAS[self.options['control_area']]['gen_freq']
-                      datapoint['gen_MW'] = int(point.quantity.text)
-                      datapoint['fuel_name'] = self.fuels[ts.MktPSRType.psrType.text]
-                    elif self.options['data'] == 'load':
-                      datapoint['load_MW'] = int(point.quantity.text)
-                    data.append(datapoint)
-        return data
+        control_area = self.options['control_area']
+        market = 'DAM' if self.options['forecast'] else 'RTHR'
+        freq = 'n/a'
+        if self.options['data'] == 'gen':
+            market = self.CONTROL_AREAS[control_area]['gen_market']
+            freq = self.CONTROL_AREAS[control_area]['gen_freq']
+        return {'ba_name': control_area, 'market': market, 'freq': freq}
 
+    def parse_frame(self, response):
+        """
+        Read the points of an XML response into a DataFrame with timestamp and value columns,
+        and a fuel_name column for generation.
+        """
+        if self.options['data'] == 'gen':
+            value_key = 'gen_MW'
+        elif self.options['data'] == 'load':
+            value_key = 'load_MW'
+
+        timestamp_pieces = []
+        value_pieces = []
+        fuel_pieces = []
+        if response is not None:
+            xmldoc = objectify.fromstring(response)
+            namespaces = {'ns': xmldoc.nsmap[None]}
+            for ts in xmldoc.TimeSeries:
+                fuel_name = None
+                if self.options['data'] == 'gen':
+                    fuel_name = self.fuels[ts.MktPSRType.psrType.text]
+
+                for period in ts.Period:
+                    initialOffset = pd.Timestamp(self.utcify(period.timeInterval.start.text))
+                    resolution = self.parse_resolution(period.resolution.text)
+
+                    # every Point of the period as arrays
+                    positions = np.array(period.xpath('ns:Point/ns:position/text()', namespaces=namespaces),
+                                         dtype='int64')
+                    quantities = np.array(period.xpath('ns:Point/ns:quantity/text()', namespaces=namespaces)
+                                          ).astype('int64')
+                    if self.options['latest']:
+                        positions = positions[-1:]
+                        quantities = quantities[-1:]
+
+                    nonzero = quantities != 0
+                    positions = positions[nonzero]
+                    quantities = quantities[nonzero]
+                    timestamp_pieces.append(
+                        initialOffset + pd.to_timedelta(positions * int(resolution.total_seconds()), unit='s'))
+                    value_pieces.append(quantities)
+                    fuel_pieces.append(np.full(len(quantities), fuel_name, dtype=object))
+
+        if len(timestamp_pieces) == 0:
+            timestamps = pd.DatetimeIndex([], tz='UTC')
+        else:
+            timestamps = timestamp_pieces[0].append(timestamp_pieces[1:])
+        df = pd.DataFrame({'timestamp': timestamps,
+                           value_key: np.concatenate(value_pieces) if value_pieces else np.array([], dtype='int64')},
+                          columns=['timestamp', value_key])
+        if self.options['data'] == 'gen':
+            df['fuel_name'] = np.concatenate(fuel_pieces) if fuel_pieces else np.array([], dtype=object)
+        return df
 
     def parse_resolution(self, resolution):
         """
@@ -1,13 +1,17 @@
-from collections import OrderedDict
+import os
+from collections import OrderedDict, namedtuple
 from datetime import datetime
 from datetime import timedelta
+from io import BytesIO
 
+import numpy as np
+import pandas as pd
 import pytz
-from lxml import objectify
+from lxml import etree, objectify
 from pandas import Timestamp
 
 from pyiso import LOGGER
-from pyiso.base import BaseClient
+from pyiso.base import BaseClient, concurrent_map
 
 
 class IESOClient(BaseClient):
@@ -21,6 +25,12 @@ class IESOClient(BaseClient):
 
     base_url = 'http://reports.ieso.ca/public/'
 
+    # dated daily or hourly reports, and yearly reports, do not change once their period is over
+    CACHE_DATED_URLS = [
+        (r'_(\d{8})\d{0,2}\.xml$', '%Y%m%d', timedelta(days=2)),
+        (r'_(\d{4})\.xml$', '%Y', timedelta(days=367)),
+    ]
+
     fuels = {
         'NUCLEAR': 'nuclear',
         'GAS': 'natgas',
@@ -36,6 +46,8 @@ class IESOClient(BaseClient):
         self.local_now = self.local_now()  # timezone aware
         self.local_start_of_day = self.local_now.replace(hour=0, minute=0, second=0, microsecond=0)
         self.local_end_of_day = self.local_now.replace(hour=23, minute=59, second=59, microsecond=999999)
+        # parsed GenOutputbyFuelHourly tables of completed years, by year
+        self.gen_output_year_tables = {}
 
     def handle_options(self, **kwargs):
         super(IESOClient, self).handle_options(**kwargs)
@@ -47,16 +59,48 @@ class IESOClient(BaseClient):
             self.options['historical'] = True
 
     def get_generation(self, latest=False, yesterday=False, start_at=None, end_at=None, **kwargs):
-        generation_ts = list([])
         self.handle_options(latest=latest, yesterday=yesterday, start_at=start_at, end_at=end_at, **kwargs)
+        return self._join_chunks(self._generation_chunks())
+
+    def get_load(self, latest=False, yesterday=False, start_at=None, end_at=None, **kwargs):
+        self.handle_options(latest=latest, yesterday=yesterday, start_at=start_at, end_at=end_at, **kwargs)
+        return self._join_chunks(self._load_chunks())
+
+    def get_trade(self, latest=False, yesterday=False, start_at=None, end_at=None, **kwargs):
+        self.handle_options(latest=latest, yesterday=yesterday, start_at=start_at, end_at=end_at, **kwargs)
+        return self._join_chunks(self._trade_chunks())
+
+    def iter_generation(self, latest=False, yesterday=False, start_at=None, end_at=None, **kwargs):
+        self.handle_options(latest=latest, yesterday=yesterday, start_at=start_at, end_at=end_at, **kwargs)
+        return self._generation_chunks()
+
+    def iter_load(self, latest=False, yesterday=False, start_at=None, end_at=None, **kwargs):
+        self.handle_options(latest=latest, yesterday=yesterday, start_at=start_at, end_at=end_at, **kwargs)
+        return self._load_chunks()
 
+    def iter_trade(self, latest=False, yesterday=False, start_at=None, end_at=None, **kwargs):
+        self.handle_options(latest=latest, yesterday=yesterday, start_at=start_at, end_at=end_at, **kwargs)
+        return self._trade_chunks()
+
+    def _join_chunks(self, chunks):
+        result_ts = list([])
+        for chunk in chunks:
+            result_ts.extend(chunk)
+        return result_ts
+
+    def _generation_chunks(self):
+        """
+        Yields generation data one report at a time, according to the options set by handle_options.
+        """
         gen_out_cap_handler = GeneratorOutputCapabilityReportHandler(ieso_client=self)
         gen_out_by_fuel_handler = GeneratorOutputByFuelHourlyReportHandler(ieso_client=self)
         adequacy_handler = AdequacyReportHandler(ieso_client=self)
 
         if self.options.get('latest', False):
+            generation_ts = list([])
             self._get_latest_report_trimmed(result_ts=generation_ts, report_handler=gen_out_cap_handler,
                                             parser_format=ParserFormat.generation)
+            yield generation_ts
         elif self.options.get('start_at', None) and self.options.get('end_at', None):
             # For long time ranges more than hour ending 1, seven days in the past, it is more efficient to request the
             # Generator Output by Fuel Type Hourly Report rather than repeated calls to the Generator Output and
@@ -66,75 +110,89 @@ class IESOClient(BaseClient):
                 self.timeout_seconds = 90  # These reports can get rather large ~7MB for a full year.
                 range_start = max(self.options['start_at'], gen_out_by_fuel_handler.earliest_available_datetime())
                 range_end = min(self.options['end_at'], gen_out_by_fuel_handler.latest_available_datetime())
-                self._get_report_range(result_ts=generation_ts, report_handler=gen_out_by_fuel_handler,
-                                       parser_format=ParserFormat.generation, range_start=range_start,
-                                       range_end=range_end)
+                for chunk in self._iter_report_range(report_handler=gen_out_by_fuel_handler,
+                                                     parser_format=ParserFormat.generation, range_start=range_start,
+                                                     range_end=range_end):
+                    yield chunk
             elif self.options.get('historical', False):
                 range_start = max(self.options['start_at'], gen_out_cap_handler.earliest_available_datetime())
                 range_end = min(self.options['end_at'], gen_out_cap_handler.latest_available_datetime())
-                self._get_report_range(result_ts=generation_ts, report_handler=gen_out_cap_handler,
-                                       parser_format=ParserFormat.generation, range_start=range_start,
-                                       range_end=range_end)
+                for chunk in self._iter_report_range(report_handler=gen_out_cap_handler,
+                                                     parser_format=ParserFormat.generation, range_start=range_start,
+                                                     range_end=range_end):
+                    yield chunk
 
             if self.options.get('forecast', False):
                 range_start = max(self.options['start_at'], self.local_now)
                 range_end = min(self.options['end_at'], adequacy_handler.latest_available_datetime())
-                self._get_report_range(result_ts=generation_ts, report_handler=adequacy_handler,
-                                       parser_format=ParserFormat.generation, range_start=range_start,
-                                       range_end=range_end)
+                for chunk in self._iter_report_range(report_handler=adequacy_handler,
+                                                     parser_format=ParserFormat.generation, range_start=range_start,
+                                                     range_end=range_end):
+                    yield chunk
         else:
             LOGGER.warn('No valid options were supplied.')
-        return generation_ts
 
-    def get_load(self, latest=False, yesterday=False, start_at=None, end_at=None, **kwargs):
-        load_ts = list([])
-        self.handle_options(latest=latest, yesterday=yesterday, start_at=start_at, end_at=end_at, **kwargs)
+    def _load_chunks(self):
+        """
+        Yields load data one report at a time, according to the options set by handle_options.
+        """
         rt_const_totals_handler = RealTimeConstrainedTotalsReportHandler(ieso_client=self)
         predisp_const_totals_handler = PredispatchConstrainedTotalsReportHandler(ieso_client=self)
 
         if self.options.get('latest', False):
+            load_ts = list([])
             self._get_latest_report_trimmed(result_ts=load_ts, report_handler=rt_const_totals_handler,
                                             parser_format=ParserFormat.load)
+            yield load_ts
         elif self.options.get('start_at', None) and self.options.get('end_at', None):
             if self.options.get('historical', False):
                 range_start = max(self.options['start_at'], rt_const_totals_handler.earliest_available_datetime())
                 range_end = min(self.options['end_at'], rt_const_totals_handler.latest_available_datetime())
-                self._get_report_range(result_ts=load_ts, report_handler=rt_const_totals_handler,
-                                       parser_format=ParserFormat.load, range_start=range_start, range_end=range_end)
+                for chunk in self._iter_report_range(report_handler=rt_const_totals_handler,
+                                                     parser_format=ParserFormat.load, range_start=range_start,
+                                                     range_end=range_end):
+                    yield chunk
             if self.options.get('forecast', False):
                 range_start = max(self.options['start_at'], rt_const_totals_handler.latest_available_datetime(),
                                   predisp_const_totals_handler.earliest_available_datetime())
                 range_end = min(self.options['end_at'], predisp_const_totals_handler.latest_available_datetime())
-                self._get_report_range(result_ts=load_ts, report_handler=predisp_const_totals_handler,
-                                       parser_format=ParserFormat.load, range_start=range_start, range_end=range_end)
+                for chunk in self._iter_report_range(report_handler=predisp_const_totals_handler,
+                                                     parser_format=ParserFormat.load, range_start=range_start,
+                                                     range_end=range_end):
+                    yield chunk
         else:
             LOGGER.warn('No valid options were supplied.')
-        return load_ts
 
-    def get_trade(self, latest=False, yesterday=False, start_at=None, end_at=None, **kwargs):
-        trade_ts = list([])
-        self.handle_options(latest=latest, yesterday=yesterday, start_at=start_at, end_at=end_at, **kwargs)
+    def _trade_chunks(self):
+        """
+        Yields trade data one report at a time, according to the options set by handle_options.
+        """
         inter_sched_flow_handler = IntertieScheduleFlowReportHandler(ieso_client=self)
         adequacy_handler = AdequacyReportHandler(ieso_client=self)
 
         if self.options.get('latest', False):
+            trade_ts = list([])
             self._get_latest_report_trimmed(result_ts=trade_ts, report_handler=inter_sched_flow_handler,
                                             parser_format=ParserFormat.trade)
+            yield trade_ts
         elif self.options.get('start_at', None) and self.options.get('end_at', None):
             if self.options.get('historical', False):
                 range_start = max(self.options['start_at'], inter_sched_flow_handler.earliest_available_datetime())
                 range_end = min(self.options['end_at'], inter_sched_flow_handler.latest_available_datetime())
-                self._get_report_range(result_ts=trade_ts, report_handler=inter_sched_flow_handler,
-                                       parser_format=ParserFormat.trade, range_start=range_start, range_end=range_end)
+                for chunk in self._iter_report_range(report_handler=inter_sched_flow_handler,
+                                                     parser_format=ParserFormat.trade, range_start=range_start,
+                                                     range_end=range_end):
+                    yield chunk
             if self.options.get('forecast', False):
                 range_start = max(self.options['start_at'], inter_sched_flow_handler.latest_available_datetime(),
                                   adequacy_handler.earliest_available_datetime())
                 range_end = min(self.options['end_at'], adequacy_handler.latest_available_datetime())
-                self._get_report_range(result_ts=trade_ts, report_handler=adequacy_handler,
-                                       parser_format=ParserFormat.trade, range_start=range_start, range_end=range_end)
+                for chunk in self._iter_report_range(report_handler=adequacy_handler,
+                                                     parser_format=ParserFormat.trade, range_start=range_start,
+                                                     range_end=range_end):
+                    yield chunk
         else:
             LOGGER.warn('No valid options were supplied.')
-        return trade_ts
 
     def _get_report_range(self, result_ts, report_handler, parser_format, range_start, range_end):
         """
@@ -144,13 +202,65 @@ class IESOClient(BaseClient):
         :param datetime range_start: The start of the time range that report data should be requested for.
         :param datetime range_end: The end of the time range that report data should be requested for.
         """
+        for chunk in self._iter_report_range(report_handler=report_handler, parser_format=parser_format,
+                                             range_start=range_start, range_end=range_end):
+            result_ts.extend(chunk)
+
+    def _iter_report_range(self, report_handler, parser_format, range_start, range_end):
+        """
+        Requests and parses the reports for the time range, up to MAX_CONCURRENT_REQUESTS at a time.
+
+        :param BaseIesoReportHandler report_handler: The report handler to be used for the time range.
+        :param str parser_format: The WattTime client format the data should be parsed into.
+        :param datetime range_start: The start of the time range that report data should be requested for.
+        :param datetime range_end: The end of the time range that report data should be requested for.
+        :return: Generator of lists of dicts, one list per report, in chronological order.
+        """
+        def _parse(response):
+            report_ts = list([])
+            if response is not None:
+                report_handler.parse_report(xml_content=response.content, result_ts=report_ts,
+                                            parser_format=parser_format, min_datetime=range_start,
+                                            max_datetime=range_end)
+            return report_ts
+
+        report_datetimes = self._report_datetimes(report_handler=report_handler, range_start=range_start,
+                                                  range_end=range_end)
+        batch_size = max(self.MAX_CONCURRENT_REQUESTS, 1)
+        for i in range(0, len(report_datetimes), batch_size):
+            # reports with a stored parsed copy are not requested again
+            batch_ts = []
+            fetch_idx = []
+            for j, report_datetime in enumerate(report_datetimes[i:i + batch_size]):
+                report_ts = list([])
+                if not report_handler.parse_stored_report(report_datetime=report_datetime, result_ts=report_ts,
+                                                          parser_format=parser_format, min_datetime=range_start,
+                                                          max_datetime=range_end):
+                    fetch_idx.append(j)
+                batch_ts.append(report_ts)
+
+            report_urls = [report_handler.report_url(report_datetime=report_datetimes[i + j]) for j in fetch_idx]
+            responses = self.request_many(report_urls, max_workers=batch_size)
+            for j, report_ts in zip(fetch_idx, concurrent_map(_parse, responses, max_workers=batch_size)):
+                batch_ts[j] = report_ts
+
+            for report_ts in batch_ts:
+                yield report_ts
+
+    def _report_datetimes(self, report_handler, range_start, range_end):
+        """
+        :param BaseIesoReportHandler report_handler: The report handler to be used for the time range.
+        :param datetime range_start: The start of the time range that report data should be requested for.
+        :param datetime range_end: The end of the time range that report data should be requested for.
+        :return: The local datetimes of every report covering the time range, in chronological order.
+        :rtype: list
+        """
+        report_datetimes = []
         report_datetime = range_start.astimezone(pytz.timezone(self.TZ_NAME))
         while report_datetime <= min(range_end, report_handler.latest_available_datetime()):
-            report_url = report_handler.report_url(report_datetime=report_datetime)
-            response = self.request(url=report_url)
-            report_handler.parse_report(xml_content=response.content, result_ts=result_ts, parser_format=parser_format,
-                                        min_datetime=range_start, max_datetime=range_end)
+            report_datetimes.append(report_datetime)
             report_datetime = report_handler.datetime_for_next_report_request(tz_aware_dt=report_datetime)
+        return report_datetimes
 
     def _get_latest_report_trimmed(self, result_ts, report_handler, parser_format):
         """
@@ -161,15 +271,7 @@ class IESOClient(BaseClient):
         """
         report_url = report_handler.report_url()
         response = self.request(url=report_url)
-        report_handler.parse_report(xml_content=response.content, result_ts=result_ts, parser_format=parser_format,
-                                    min_datetime=report_handler.earliest_available_datetime(),
-                                    max_datetime=report_handler.latest_available_datetime())
-        last_timestamp = result_ts[-1].get('timestamp', None)
-        i = len(result_ts) - 1
-        while i >= 0:
-            if result_ts[i].get('timestamp', None) != last_timestamp:
-                del result_ts[i]
-            i -= 1
+        report_handler.parse_latest(xml_content=response.content, result_ts=result_ts, parser_format=parser_format)
 
 
 class BaseIesoReportHandler(object):
@@ -178,6 +280,9 @@ class BaseIesoReportHandler(object):
     """
     BASE_URL = 'http://reports.ieso.ca/public/'
 
+    # IESO fuel names, in the column order of parsed fuel arrays
+    fuel_columns = ['NUCLEAR', 'GAS', 'HYDRO', 'WIND', 'SOLAR', 'BIOFUEL', 'OTHER']
+
     def __init__(self, ieso_client):
         """
         :param IESOClient ieso_client: The WattTime client that this report handler is parsing data for.
@@ -244,6 +349,33 @@ class BaseIesoReportHandler(object):
         """
         raise NotImplementedError('Derived classes must implement the parse_report method.')
 
+    def parse_latest(self, xml_content, result_ts, parser_format):
+        """
+        Parses only the latest available interval of the report and appends it to a timeseries of results.
+        Derived classes can override this to skip work on the earlier intervals.
+
+        :param str xml_content: The XML response body of the report.
+        :param list result_ts: The timeseries (a list of dicts) which results should be appended to.
+        :param str parser_format: The parser format used to append results.
+        """
+        report_ts = list([])
+        self.parse_report(xml_content=xml_content, result_ts=report_ts, parser_format=parser_format,
+                          min_datetime=self.earliest_available_datetime(),
+                          max_datetime=self.latest_available_datetime())
+        if report_ts:
+            last_timestamp = report_ts[-1].get('timestamp', None)
+            result_ts.extend(row for row in report_ts if row.get('timestamp', None) == last_timestamp)
+
+    def parse_stored_report(self, report_datetime, result_ts, parser_format, min_datetime, max_datetime):
+        """
+        Parses a previously parsed copy of the report, if one is available, so that it need not be requested again.
+        Takes the same arguments as parse_report, with the report's datetime instead of its content.
+
+        :return: True if the results were appended from a stored copy, otherwise False.
+        :rtype: bool
+        """
+        return False
+
     def append_generation(self, result_ts, tz_aware_dt, gen_mw, fuel):
         """
         Appends a dict to the results list, with the keys [ba_name, timestamp, freq, market, fuel_name, gen_MW].
@@ -405,32 +537,52 @@ class IntertieScheduleFlowReportHandler(BaseIesoReportHandler):
 
     def parse_report(self, xml_content, result_ts, parser_format, min_datetime, max_datetime):
         if parser_format == ParserFormat.trade:
-            document = objectify.fromstring(xml_content)
-            doc_body = document.IMODocBody
-            doc_date_local = doc_body.Date  # %Y%m%d
-
-            for actual in doc_body.Totals.Actuals.Actual:
-                net_exp_mw = actual.Flow
-                hour_local = str(actual.Hour - 1).zfill(2)
-                minutes = actual.Interval * 5  # Interval 1 is minute 05. Interval 12 is minute 60 (ie. 00:00 next hour)
-                hr_start_str = doc_date_local + ' ' + hour_local + ':00'
-                row_datetime = self.ieso_client.utcify(local_ts_str=hr_start_str) + timedelta(minutes=minutes)
-
-                # For the current day the report fills  "Actual" elements in the future with the value 0. Batches of
-                # 5-minute observations are posted hourly, at the end of the hour. Furthermore, the time between the
-                # end of an hour and the report's availability online is typically 30 minutes. The end-of-hour
-                # reporting schedule combined with time lag before the report is available online means that
-                # ~1.5 hours of "recent" observations could be filled with 0 values. Although a bit hacky, it's
-                # unlikely that net exports are exactly 0MW for an interval, so skip recording data in these cases.
-                skip = False
-                if net_exp_mw == 0 and row_datetime > (self.ieso_client.local_now - timedelta(hours=2)):
-                    skip = True
-
-                if min_datetime <= row_datetime <= max_datetime and not skip:
+            for row_datetime, net_exp_mw in self._iter_actuals(xml_content=xml_content):
+                if min_datetime <= row_datetime <= max_datetime:
                     self.append_trade(result_ts=result_ts, tz_aware_dt=row_datetime, net_exp_mw=net_exp_mw)
         else:
             raise RuntimeError('Intertie Schedule Flow Report can only be parsed using trade format.')
 
+    def parse_latest(self, xml_content, result_ts, parser_format):
+        if parser_format == ParserFormat.trade:
+            # Actuals are in chronological order, so read from the end until the first available interval.
+            max_datetime = self.latest_available_datetime()
+            for row_datetime, net_exp_mw in self._iter_actuals(xml_content=xml_content, reverse=True):
+                if row_datetime <= max_datetime:
+                    self.append_trade(result_ts=result_ts, tz_aware_dt=row_datetime, net_exp_mw=net_exp_mw)
+                    break
+        else:
+            raise RuntimeError('Intertie Schedule Flow Report can only be parsed using trade format.')
+
+    def _iter_actuals(self, xml_content, reverse=False):
+        """
+        Yields (datetime, net exports in MW) for each reported "Actual" element, skipping unfilled intervals.
+        """
+        document = objectify.fromstring(xml_content)
+        doc_body = document.IMODocBody
+        doc_date_local = doc_body.Date  # %Y%m%d
+        # IESO is always in standard time, so every row can be offset from the start of the day in UTC.
+        day_start = self.ieso_client.utcify(local_ts_str=doc_date_local + ' 00:00')
+
+        actuals = list(doc_body.Totals.Actuals.Actual)
+        if reverse:
+            actuals.reverse()
+        for actual in actuals:
+            net_exp_mw = actual.Flow
+            minutes = actual.Interval * 5  # Interval 1 is minute 05. Interval 12 is minute 60 (ie. 00:00 next hour)
+            row_datetime = day_start + timedelta(hours=actual.Hour - 1, minutes=minutes)
+
+            # For the current day the report fills  "Actual" elements in the future with the value 0. Batches of
+            # 5-minute observations are posted hourly, at the end of the hour. Furthermore, the time between the
+            # end of an hour and the report's availability online is typically 30 minutes. The end-of-hour
+            # reporting schedule combined with time lag before the report is available online means that
+            # ~1.5 hours of "recent" observations could be filled with 0 values. Although a bit hacky, it's
+            # unlikely that net exports are exactly 0MW for an interval, so skip recording data in these cases.
+            if net_exp_mw == 0 and row_datetime > (self.ieso_client.local_now - timedelta(hours=2)):
+                continue
+
+            yield row_datetime, net_exp_mw
+
 
 class AdequacyReportHandler(BaseIesoReportHandler):
     def report_interval(self):
@@ -466,7 +618,7 @@ class AdequacyReportHandler(BaseIesoReportHandler):
     def parse_report(self, xml_content, result_ts, parser_format, min_datetime, max_datetime):
         document = objectify.fromstring(xml_content)
         doc_body = document.DocBody
-        day_start_str = doc_body.DeliveryDate + ' 00:00:00'
+        day_start = self.ieso_client.utcify(local_ts_str=doc_body.DeliveryDate + ' 00:00:00')
         if parser_format == ParserFormat.generation:
             # InternalResources is misleading. Each fuel is an internal resource, and we iterate hours of each fuel.
             for internal_resource in doc_body.ForecastSupply.InternalResources.InternalResource:
@@ -475,7 +627,7 @@ class AdequacyReportHandler(BaseIesoReportHandler):
                     for schedule in internal_resource.Schedules.Schedule:
                         fuel_gen_mw = schedule.EnergyMW.pyval
                         hr_ending = schedule.DeliveryHour.pyval
-                        row_datetime = self.ieso_client.utcify(local_ts_str=day_start_str) + timedelta(hours=hr_ending)
+                        row_datetime = day_start + timedelta(hours=hr_ending)
                         if min_datetime <= row_datetime <= max_datetime:
                             self.append_generation(result_ts=result_ts, tz_aware_dt=row_datetime, fuel=fuel,
                                                    gen_mw=fuel_gen_mw)
@@ -483,11 +635,11 @@ class AdequacyReportHandler(BaseIesoReportHandler):
             imports_exports = OrderedDict()  # {'ts_local':{'import'|'export',val_mw}}
             for import_schedule in doc_body.ForecastSupply.ZonalImports.TotalImports.Schedules.Schedule:
                 hr_ending = import_schedule.DeliveryHour.pyval
-                row_datetime = self.ieso_client.utcify(local_ts_str=day_start_str) + timedelta(hours=hr_ending)
+                row_datetime = day_start + timedelta(hours=hr_ending)
                 imports_exports[row_datetime] = {'import': import_schedule.EnergyMW.pyval}
             for export_schedule in doc_body.ForecastDemand.ZonalExports.TotalExports.Schedules.Schedule:
                 hr_ending = export_schedule.DeliveryHour.pyval
-                row_datetime = self.ieso_client.utcify(local_ts_str=day_start_str) + timedelta(hours=hr_ending)
+                row_datetime = day_start + timedelta(hours=hr_ending)
                 hr_entry = imports_exports.get(row_datetime)
                 hr_entry.update({'export': export_schedule.EnergyMW.pyval})
                 imports_exports[row_datetime] = hr_entry
@@ -526,14 +678,14 @@ class RealTimeConstrainedTotalsReportHandler(BaseIesoReportHandler):
         day = doc_body.DeliveryDate
         if parser_format == ParserFormat.load:
             hour_local = str(doc_body.DeliveryHour - 1).zfill(2)
+            hr_start = self.ieso_client.utcify(local_ts_str=day + ' ' + hour_local + ':00')
             for interval_energy in doc_body.Energies.IntervalEnergy:
                 # Interval 1 is minute 05. Interval 12 is minute 60 (ie. 00:00 next hour)
                 minutes = interval_energy.Interval * 5
-                hr_start_str = day + ' ' + hour_local + ':00'
                 for mq in interval_energy.MQ:
                     if mq.MarketQuantity == 'ONTARIO DEMAND':
                         load_mw = mq.EnergyMW.pyval
-                        row_datetime = self.ieso_client.utcify(local_ts_str=hr_start_str) + timedelta(minutes=minutes)
+                        row_datetime = hr_start + timedelta(minutes=minutes)
                         if min_datetime <= row_datetime <= max_datetime:
                             self.append_load(result_ts=result_ts, tz_aware_dt=row_datetime, load_mw=load_mw)
         else:
@@ -559,14 +711,14 @@ class PredispatchConstrainedTotalsReportHandler(BaseIesoReportHandler):
     def parse_report(self, xml_content, result_ts, parser_format, min_datetime, max_datetime):
         document = objectify.fromstring(xml_content)
         doc_body = document.DocBody
-        day_start_str = doc_body.DeliveryDate + ' 00:00:00'
+        day_start = self.ieso_client.utcify(local_ts_str=doc_body.DeliveryDate + ' 00:00:00')
         if parser_format == ParserFormat.load:
             for hrly_const_energy in doc_body.Energies.HourlyConstrainedEnergy:
                 hr_ending = hrly_const_energy.DeliveryHour.pyval
                 for mq in hrly_const_energy.MQ:
                     if mq.MarketQuantity == 'Total Load':
                         load_mw = mq.EnergyMW.pyval
-                        row_datetime = self.ieso_client.utcify(local_ts_str=day_start_str) + timedelta(hours=hr_ending)
+                        row_datetime = day_start + timedelta(hours=hr_ending)
                         if min_datetime <= row_datetime <= max_datetime:
                             self.append_load(result_ts=result_ts, tz_aware_dt=row_datetime, load_mw=load_mw)
         else:
@@ -604,37 +756,81 @@ class GeneratorOutputCapabilityReportHandler(BaseIesoReportHandler):
 
     def parse_report(self, xml_content, result_ts, parser_format, min_datetime, max_datetime):
         if parser_format == ParserFormat.generation:
-            imo_document = objectify.fromstring(xml_content)
-            imo_doc_body = imo_document.IMODocBody
-            day_start_str = imo_doc_body.Date + ' 00:00:00'
-            fuels_hourly = {}
-            for fuel in IESOClient.fuels.keys():
-                fuels_hourly[fuel] = {}
-
-            # Iterate over each hourly value for each generator, creating a dictionary keyed by fuel and values are
-            # lists containing generation by hour-of-day.
-            for generator in imo_doc_body.Generators.Generator:
-                fuel_type = generator.FuelType
-                for output in generator.Outputs.Output:
-                    hr_ending = output.Hour.pyval
-                    try:
-                        gen_mw = output.EnergyMW
-                    except AttributeError:  # Inexplicably, some 'Output' elements are missing 'EnergyMW' child element.
-                        gen_mw = 0
-                    fuel_hour_endings = fuels_hourly[fuel_type]
-                    existing_gen_mw = fuel_hour_endings.get(hr_ending, 0)
-                    fuel_hour_endings[hr_ending] = existing_gen_mw + gen_mw
-
-            # Iterate over aggregated results to create generation fuel mix format
-            for fuel, fuel_hour_endings in fuels_hourly.items():
-                for fuel_hr_ending, fuel_gen_mw in fuel_hour_endings.items():
-                    row_datetime = self.ieso_client.utcify(local_ts_str=day_start_str) + timedelta(hours=fuel_hr_ending)
-                    if min_datetime <= row_datetime <= max_datetime:
-                        self.append_generation(result_ts=result_ts, tz_aware_dt=row_datetime, fuel=fuel,
-                                               gen_mw=fuel_gen_mw)
+            report_date, gen_mw, reported = self.parse_fuel_hours(xml_content=xml_content)
+            day_start = self.ieso_client.utcify(local_ts_str=report_date + ' 00:00:00')
+
+            # Create generation fuel mix format for every reported fuel-hour pair
+            for hour_idx, fuel_idx in zip(*np.nonzero(reported)):
+                row_datetime = day_start + timedelta(hours=int(hour_idx) + 1)
+                if min_datetime <= row_datetime <= max_datetime:
+                    self.append_generation(result_ts=result_ts, tz_aware_dt=row_datetime,
+                                           fuel=self.fuel_columns[fuel_idx], gen_mw=float(gen_mw[hour_idx, fuel_idx]))
+        else:
+            raise RuntimeError('Generator Output Capability Report can only be parsed using generation format.')
+
+    def parse_latest(self, xml_content, result_ts, parser_format):
+        if parser_format == ParserFormat.generation:
+            report_date, gen_mw, reported = self.parse_fuel_hours(xml_content=xml_content)
+            day_start = self.ieso_client.utcify(local_ts_str=report_date + ' 00:00:00')
+
+            # only the latest available hour with any reported output
+            max_datetime = self.latest_available_datetime()
+            for hour_idx in reversed(np.nonzero(reported.any(axis=1))[0]):
+                row_datetime = day_start + timedelta(hours=int(hour_idx) + 1)
+                if row_datetime <= max_datetime:
+                    for fuel_idx in np.nonzero(reported[hour_idx])[0]:
+                        self.append_generation(result_ts=result_ts, tz_aware_dt=row_datetime,
+                                               fuel=self.fuel_columns[fuel_idx],
+                                               gen_mw=float(gen_mw[hour_idx, fuel_idx]))
+                    break
         else:
             raise RuntimeError('Generator Output Capability Report can only be parsed using generation format.')
 
+    def parse_fuel_hours(self, xml_content):
+        """
+        Streams the report, summing each generator's hourly output by fuel and clearing each generator once read.
+
+        :param str xml_content: The XML response body of the report.
+        :return: The report date string, a 24 hour x fuel array of generation in MW, and a 24 hour x fuel boolean
+            array marking the hours that were reported for each fuel. Fuel columns follow fuel_columns.
+        :rtype: tuple
+        """
+        fuel_indexes = dict((fuel, i) for i, fuel in enumerate(self.fuel_columns))
+        gen_mw = np.zeros((24, len(self.fuel_columns)))
+        reported = np.zeros((24, len(self.fuel_columns)), dtype=bool)
+        report_date = None
+        fuel_idx = None
+
+        for event, elem in etree.iterparse(BytesIO(xml_content), events=('end',)):
+            tag = elem.tag.rsplit('}', 1)[-1]
+            if tag == 'Date' and report_date is None:
+                report_date = elem.text
+            elif tag == 'FuelType':
+                fuel_idx = fuel_indexes.get(elem.text)
+                if fuel_idx is None:
+                    LOGGER.warn('%s: unknown fuel type %s' % (IESOClient.NAME, elem.text))
+            elif tag == 'Output' and fuel_idx is not None:
+                hr_ending = None
+                output_mw = 0  # Inexplicably, some 'Output' elements are missing 'EnergyMW' child element.
+                for child in elem:
+                    child_tag = child.tag.rsplit('}', 1)[-1]
+                    if child_tag == 'Hour':
+                        hr_ending = int(child.text)
+                    elif child_tag == 'EnergyMW':
+                        output_mw = float(child.text)
+                if hr_ending is not None and 1 <= hr_ending <= 24:
+                    gen_mw[hr_ending - 1, fuel_idx] += output_mw
+                    reported[hr_ending - 1, fuel_idx] = True
+            elif tag == 'Generator':
+                fuel_idx = None
+
+                # free this generator and any already processed siblings
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+
+        return report_date, gen_mw, reported
+
     def report_url(self, report_datetime=None):
         filename = 'PUB_GenOutputCapability.xml'
         if report_datetime is not None:
@@ -684,23 +880,141 @@ class GeneratorOutputByFuelHourlyReportHandler(BaseIesoReportHandler):
     def latest_available_datetime(self):
         return self.ieso_client.local_now
 
+    def parse_stored_report(self, report_datetime, result_ts, parser_format, min_datetime, max_datetime):
+        year = self.datetime_for_report_request(report_datetime).year
+        year_table = self.stored_year_table(year)
+        if year_table is None:
+            return False
+        self.append_year_table(year_table=year_table, result_ts=result_ts, min_datetime=min_datetime,
+                               max_datetime=max_datetime)
+        return True
+
     def parse_report(self, xml_content, result_ts, parser_format, min_datetime, max_datetime):
-        document = objectify.fromstring(xml_content)
-        doc_body = document.DocBody
-        for daily_data in doc_body.DailyData:
-            day_start_str = daily_data.Day + ' 00:00:00'
-            for hourly_data in daily_data.HourlyData:
-                hr_ending = hourly_data.Hour.pyval
-                row_datetime = self.ieso_client.utcify(local_ts_str=day_start_str) + timedelta(hours=hr_ending)
-                if min_datetime <= row_datetime <= max_datetime:
-                    for fuel_total in hourly_data.FuelTotal:
-                        fuel = fuel_total.Fuel
-                        try:
-                            fuel_gen_mw = fuel_total.EnergyValue.Output
-                        except AttributeError:  # When 'OutputQuality' value is -1, there is not 'Output' element.
-                            fuel_gen_mw = 0
-                        self.append_generation(result_ts=result_ts, tz_aware_dt=row_datetime, fuel=fuel,
-                                               gen_mw=fuel_gen_mw)
+        year_table = self.parse_year_table(xml_content=xml_content)
+        self.store_year_table(year_table)
+        self.append_year_table(year_table=year_table, result_ts=result_ts, min_datetime=min_datetime,
+                               max_datetime=max_datetime)
+
+    def parse_year_table(self, xml_content):
+        """
+        Streams the report into a compact table with one row per hour and one column per fuel, clearing each day once
+        read.
+
+        :param str xml_content: The XML response body of the report.
+        :return: A YearTable, with hour ending timestamps as UTC nanoseconds, and generation in MW (NaN when a fuel
+            is not reported for an hour).
+        :rtype: YearTable
+        """
+        fuel_indexes = dict((fuel, i) for i, fuel in enumerate(self.fuel_columns))
+        year = None
+        days = []
+        day_idxs = []
+        hr_endings = []
+        gen_rows = []
+        hr_ending = None
+        gen_row = np.full(len(self.fuel_columns), np.nan)
+
+        for event, elem in etree.iterparse(BytesIO(xml_content), events=('end',)):
+            tag = elem.tag.rsplit('}', 1)[-1]
+            if tag == 'FuelTotal':
+                fuel = None
+                fuel_gen_mw = 0  # When 'OutputQuality' value is -1, there is not 'Output' element.
+                for child in elem.iter():
+                    child_tag = child.tag.rsplit('}', 1)[-1]
+                    if child_tag == 'Fuel':
+                        fuel = child.text
+                    elif child_tag == 'Output':
+                        fuel_gen_mw = float(child.text)
+                if fuel in fuel_indexes:
+                    gen_row[fuel_indexes[fuel]] = fuel_gen_mw
+            elif tag == 'Hour':
+                hr_ending = int(elem.text)
+            elif tag == 'HourlyData':
+                day_idxs.append(len(days) - 1)
+                hr_endings.append(hr_ending)
+                gen_rows.append(gen_row)
+                gen_row = np.full(len(self.fuel_columns), np.nan)
+            elif tag == 'Day':
+                days.append(elem.text)
+            elif tag == 'DailyData':
+                # free this day and any already processed siblings
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+            elif tag == 'DeliveryYear':
+                year = int(elem.text)
+
+        day_starts = self.ieso_client.utcify_array(days).values.astype('datetime64[ns]').astype('int64')
+        timestamps = day_starts[np.array(day_idxs, dtype='int64')] + np.array(hr_endings, dtype='int64') * 3600 * 10**9
+        gen = np.array(gen_rows, dtype='float64').reshape(len(gen_rows), len(self.fuel_columns))
+        return YearTable(year=year, timestamps=timestamps.astype('int64'), gen=gen)
+
+    def append_year_table(self, year_table, result_ts, min_datetime, max_datetime):
+        """
+        Appends the generation in a YearTable between min_datetime and max_datetime to the results.
+        """
+        # the table is in time order, so the range is a contiguous block of rows
+        start = np.searchsorted(year_table.timestamps, Timestamp(min_datetime).value, side='left')
+        end = np.searchsorted(year_table.timestamps, Timestamp(max_datetime).value, side='right')
+
+        timestamps = pd.DatetimeIndex(year_table.timestamps[start:end]).tz_localize(pytz.utc)
+        gen = year_table.gen[start:end]
+        for row_datetime, gen_row in zip(timestamps, gen):
+            for fuel, fuel_gen_mw in zip(self.fuel_columns, gen_row):
+                if not np.isnan(fuel_gen_mw):
+                    self.append_generation(result_ts=result_ts, tz_aware_dt=row_datetime, fuel=fuel,
+                                           gen_mw=float(fuel_gen_mw))
+
+    def store_year_table(self, year_table):
+        """
+        Keeps the table of a completed year on the client, and in its cache directory if caching is enabled.
+        """
+        if year_table.year >= self.ieso_client.local_now.year:
+            return
+        self.ieso_client.gen_output_year_tables[year_table.year] = year_table
+
+        cache = self.ieso_client.get_cache()
+        if cache is not None:
+            try:
+                for name in ['timestamps', 'gen']:
+                    np.save(self._year_table_path(cache, year_table.year, name), getattr(year_table, name))
+            except (IOError, OSError) as e:
+                LOGGER.warn('Failed to cache IESO generation table for %d: %s' % (year_table.year, e))
+            cache.evict()
+
+    def stored_year_table(self, year):
+        """
+        :param int year: The report year.
+        :return: The stored YearTable for a completed year, memory-mapped from the cache directory if the client
+            does not already hold it, or None.
+        :rtype: YearTable
+        """
+        year_tables = self.ieso_client.gen_output_year_tables
+        if year in year_tables:
+            return year_tables[year]
+
+        cache = self.ieso_client.get_cache()
+        if cache is None:
+            return None
+        paths = dict((name, self._year_table_path(cache, year, name)) for name in ['timestamps', 'gen'])
+        try:
+            year_table = YearTable(year=year,
+                                   timestamps=np.load(paths['timestamps'], mmap_mode='r'),
+                                   gen=np.load(paths['gen'], mmap_mode='r'))
+            # the modification time records the last use, for the cache's LRU eviction
+            for path in paths.values():
+                os.utime(path, None)
+        except (IOError, OSError, ValueError):
+            return None
+        year_tables[year] = year_table
+        return year_table
+
+    def _year_table_path(self, cache, year, name):
+        return os.path.join(cache.cache_dir, 'ieso_GenOutputbyFuelHourly_%d_%s.npy' % (year, name))
+
+
+# Generation by fuel for one year of hours: year, timestamps (hour ending, UTC nanoseconds) and gen (hour x fuel MW).
+YearTable = namedtuple('YearTable', ['year', 'timestamps', 'gen'])
 
 
 class ParserFormat:
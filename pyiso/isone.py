@@ -1,6 +1,7 @@
-from pyiso.base import BaseClient
+from pyiso.base import BaseClient, concurrent_map
 from pyiso import LOGGER
 from os import environ
+import numpy as np
 import pandas as pd
 
 
@@ -49,25 +50,9 @@ class ISONEClient(BaseClient):
         self.handle_options(data='gen', latest=latest,
                             start_at=start_at, end_at=end_at, **kwargs)
 
-        # set up storage
-        raw_data = []
-        parsed_data = []
-
-        # collect raw data
-        for endpoint in self.request_endpoints():
-            # carry out request
-            data = self.fetch_data(endpoint, self.auth)
-
-            # pull out data
-            try:
-                raw_data += data['GenFuelMixes']['GenFuelMix']
-            except KeyError as e:
-                LOGGER.warn(e)
-                continue
-
-        # parse data
+        # fetch and parse data
         try:
-            df = self._parse_json(raw_data)
+            df = self.fetch_frame(self.parse_json_gen_data)
         except ValueError:
             return []
         df = self.slice_times(df)
@@ -81,24 +66,9 @@ class ISONEClient(BaseClient):
         self.handle_options(data='load', latest=latest, forecast=forecast,
                             start_at=start_at, end_at=end_at, **kwargs)
 
-        # set up storage
-        raw_data = []
-
-        # collect raw data
-        for endpoint in self.request_endpoints():
-            # carry out request
-            data = self.fetch_data(endpoint, self.auth)
-
-            # pull out data
-            try:
-                raw_data += self.parse_json_load_data(data)
-            except ValueError as e:
-                LOGGER.warn(e)
-                continue
-
-        # parse data
+        # fetch and parse data
         try:
-            df = self._parse_json(raw_data)
+            df = self.fetch_frame(self.parse_json_load_data)
         except ValueError:
             return []
         df = self.slice_times(df)
@@ -167,6 +137,44 @@ class ISONEClient(BaseClient):
         # return
         return request_endpoints
 
+    def get_session(self):
+        """
+        Return this client's pooled requests.Session, authenticated with the ISONE credentials.
+        """
+        session = super(ISONEClient, self).get_session()
+        session.auth = self.auth
+        return session
+
+    def fetch_frame(self, extract):
+        """
+        Fetch every request endpoint concurrently, up to MAX_CONCURRENT_REQUESTS at a time,
+        and parse each day's data as soon as its response is decoded.
+        Raise ValueError if no data was found.
+
+        :param extract: Callable that pulls the list of records out of the decoded json.
+            Raises ValueError if the data cannot be parsed.
+        :return: DataFrame of parsed records, in endpoint order.
+        """
+        def _fetch(endpoint):
+            data = self.fetch_data(endpoint, self.auth)
+            try:
+                records = extract(data)
+                if len(records) == 0:
+                    return None
+                return self._parse_json(records)
+            except ValueError as e:
+                LOGGER.warn(e)
+                return None
+
+        # create the shared session before any worker needs it
+        self.get_session()
+
+        pieces = concurrent_map(_fetch, self.request_endpoints(), max_workers=self.MAX_CONCURRENT_REQUESTS)
+        pieces = [piece for piece in pieces if piece is not None]
+        if len(pieces) == 0:
+            raise ValueError('No data found for ISONE %s' % self.options)
+        return pd.concat(pieces)
+
     def fetch_data(self, endpoint, auth):
         url = self.base_url + endpoint
         response = self.request(url, auth=auth)
@@ -175,6 +183,16 @@ class ISONEClient(BaseClient):
         else:
             return {}
 
+    def parse_json_gen_data(self, data):
+        """
+        Pull genmix records from json data set.
+        Raise ValueError if parser fails.
+        """
+        try:
+            return data['GenFuelMixes']['GenFuelMix']
+        except (KeyError, TypeError):
+            raise ValueError('Could not parse ISONE gen data %s' % data)
+
     def parse_json_load_data(self, data):
         """
         Pull approriate keys from json data set.
@@ -194,34 +212,35 @@ class ISONEClient(BaseClient):
         if len(json) == 0:
             raise ValueError('No data found for ISONE %s' % self.options)
 
-        df = pd.DataFrame(json)
+        # pull only the needed fields into arrays
+        if self.options['data'] == 'gen':
+            value_key, value_col = 'GenMw', 'gen_MW'
+        else:
+            value_key, value_col = 'LoadMw', 'load_MW'
+        try:
+            begin_dates = np.array([record['BeginDate'] for record in json], dtype=object)
+            values = np.array([record[value_key] for record in json], dtype=np.float64)
+            if self.options['data'] == 'gen':
+                fuel_categories = np.array([record['FuelCategory'] for record in json], dtype=object)
+        except (KeyError, TypeError):
+            raise ValueError('Could not parse ISONE %s data' % self.options['data'])
 
-        # Get datetimes
-        df.index = df['BeginDate']
-        df.index = pd.to_datetime(df.index, utc=True)
-        df['timestamp'] = df.index
+        # Get datetimes, parsing each distinct timestamp once
+        codes, uniques = pd.factorize(begin_dates)
+        timestamps = pd.DatetimeIndex(pd.to_datetime(uniques, utc=True))[codes]
+        df = pd.DataFrame({'timestamp': timestamps, value_col: values}, index=timestamps)
 
         # other attributes
         df['ba_name'] = self.NAME
         df['market'] = self.options['market']
         df['freq'] = self.options['frequency']
 
-        # genmix specific
+        # genmix specific: look up each fuel category once
         if self.options['data'] == 'gen':
-            df.rename(columns={'GenMw': 'gen_MW'}, inplace=True)
-            df['fuel_name'] = df['FuelCategory'].apply(lambda x: self.fuels[x])
-
-        # load specific
-        if self.options['data'] == 'load':
-            df.rename(columns={'LoadMw': 'load_MW'}, inplace=True)
-
-        # drop unwanted columns
-        df.drop(['BeginDate',
-                 'CongestionComponent', 'EnergyComponent', 'LossComponent', 'Location',
-                 'FuelCategory', 'MarginalFlag', 'FuelCategoryRollup',
-                 'NetLoadMw', 'CreationDate', 'NativeLoad', 'ArdDemand',
-                 ],
-                axis=1, inplace=True, errors='ignore')
+            # plain strings, since days with different fuel orders are concatenated later
+            codes, categories = pd.factorize(fuel_categories)
+            fuel_names = np.array([self.fuels[category] for category in categories], dtype=object)
+            df['fuel_name'] = fuel_names[codes]
 
         return df
 
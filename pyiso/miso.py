@@ -3,7 +3,7 @@ from pyiso.base import BaseClient
 from pyiso import LOGGER
 import pandas as pd
 from io import BytesIO
-from datetime import datetime
+from datetime import datetime, timedelta
 
 IntervalChoices = namedtuple('IntervalChoices',
                              ['hourly', 'hourly_prelim', 'fivemin', 'tenmin',
@@ -16,6 +16,11 @@ class MISOClient(BaseClient):
     base_url = 'https://api.misoenergy.org/MISORTWDDataBroker/DataBrokerServices.asmx'
     docs_url = 'https://docs.misoenergy.org/marketreports/'
 
+    # day-ahead ex-ante reports are final once published
+    CACHE_DATED_URLS = [
+        (r'/(\d{8})_da_ex\.xls$', '%Y%m%d', timedelta(days=1)),
+    ]
+
     fuels = {
         'Coal': 'coal',
         'Natural Gas': 'natgas',
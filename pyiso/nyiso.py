@@ -1,8 +1,12 @@
+import os
+import re
+import zipfile
+from io import BytesIO
 from pyiso.base import BaseClient
 from pyiso import LOGGER
 import numpy as np
 import pandas as pd
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 
 class NYISOClient(BaseClient):
@@ -12,6 +16,16 @@ class NYISOClient(BaseClient):
 
     TZ_NAME = 'America/New_York'
 
+    # daily csvs and monthly zips do not change once their day or month is over
+    CACHE_DATED_URLS = [
+        (r'/(\d{8})\w+\.csv$', '%Y%m%d', timedelta(days=2)),
+        (r'/(\d{6})01\w+_csv\.zip$', '%Y%m', timedelta(days=33)),
+    ]
+
+    # months before the current one with at least this many wanted dates are fetched as one monthly archive,
+    # which holds the whole month, rather than as daily csvs
+    monthly_archive_min_dates = 8
+
     fuel_names = {
         'Other Fossil Fuels': 'fossil',  # coal or oil
         'Other Renewables': 'renewable',  # solar, methane, refuse, wood
@@ -116,20 +130,10 @@ class NYISOClient(BaseClient):
             dates_list = self.dates()
 
         # fetch and parse all csvs
-        for date in dates_list:
-            for csv in self.fetch_csvs(date, label):
-
-                try:
-                    pieces.append(parser(csv))
-                except AttributeError:
-                    pass
-
-            # if fetch_csvs cannot get the individual days, it gets the whole month
-            # Shortcut the loop if any call to fetch_csvs gets all dates in dates_list
+        for csv in self.fetch_csvs_for_dates(dates_list, label):
             try:
-                if (pieces[-1].index[-1] - timedelta(days=1)).date() > max(dates_list):
-                    break
-            except IndexError:
+                pieces.append(parser(csv))
+            except AttributeError:
                 pass
 
         # combine pieces
@@ -149,10 +153,95 @@ class NYISOClient(BaseClient):
         sliced = self.slice_times(df)
         return sliced
 
+    def fetch_csvs_for_dates(self, dates_list, label):
+        """
+        Fetch the csvs covering every date in dates_list, downloading each monthly archive at most once.
+        Dates in months before the current month come from the monthly zip archive
+        if at least monthly_archive_min_dates of them are wanted.
+        Other dates come from the daily csv, falling back to their month's archive if it is missing.
+
+        :param list dates_list: Local dates to fetch.
+        :param str label: Report label, eg 'rtfuelmix'.
+        :return: List of csv contents in date order.
+        :rtype: list
+        """
+        dates_list = sorted(set(dates_list))
+        this_month = self.local_now().date().replace(day=1)
+        dates_per_month = {}
+        for date in dates_list:
+            month = date.replace(day=1)
+            dates_per_month[month] = dates_per_month.get(month, 0) + 1
+        archive_months = sorted(month for month, n_dates in dates_per_month.items()
+                                if month < this_month and n_dates >= self.monthly_archive_min_dates)
+        daily_dates = [date for date in dates_list if date.replace(day=1) not in archive_months]
+
+        # request daily files and archives together
+        urls = [self.daily_csv_url(date, label) for date in daily_dates]
+        urls += [self.monthly_zip_url(month, label) for month in archive_months]
+        responses = self.request_many(urls)
+        daily_responses = responses[:len(daily_dates)]
+        archive_responses = responses[len(daily_dates):]
+
+        csvs_by_date = {}
+        for date, response in zip(daily_dates, daily_responses):
+            if response and response.status_code == 200:
+                csvs_by_date[date] = response.text
+
+        # missing daily files come from their month's archive
+        missing_months = sorted(set(date.replace(day=1) for date in daily_dates if date not in csvs_by_date))
+        if missing_months:
+            LOGGER.info('Failed to find daily %s data for %d dates, using monthly data' %
+                        (label, len(daily_dates) - len(csvs_by_date)))
+            archive_months += missing_months
+            archive_responses += self.request_many([self.monthly_zip_url(month, label)
+                                                    for month in missing_months])
+
+        wanted = set(dates_list) - set(csvs_by_date)
+        for month, response in zip(archive_months, archive_responses):
+            if not response:
+                LOGGER.warn('No %s data found for month %s' % (label, month.strftime('%Y-%m')))
+                continue
+            members = self.unzip_by_date(response.content, wanted)
+            if members:
+                csvs_by_date.update(members)
+
+        return [csvs_by_date[date] for date in sorted(csvs_by_date)]
+
+    def unzip_by_date(self, content, dates):
+        """
+        Unzip the members of a monthly archive whose file names start with one of the given dates.
+
+        :param bytes content: Zip archive content.
+        :param set dates: Local dates to extract.
+        :return: Dict of date to member content, or None if the archive could not be read.
+        :rtype: dict
+        """
+        try:
+            z = zipfile.ZipFile(BytesIO(content))
+        except zipfile.BadZipfile:
+            LOGGER.error('%s: unzip failure for content beginning:\n%s' % (self.NAME, str(content)[0:100]))
+            return None
+
+        members = {}
+        for name in z.namelist():
+            match = re.match(r'(\d{8})', os.path.basename(name))
+            if not match:
+                continue
+            date = datetime.strptime(match.group(1), '%Y%m%d').date()
+            if date in dates:
+                members[date] = z.read(name)
+        z.close()
+        return members
+
+    def daily_csv_url(self, date, label):
+        return '%s/%s/%s%s.csv' % (self.base_url, label, date.strftime('%Y%m%d'), label)
+
+    def monthly_zip_url(self, date, label):
+        return '%s/%s/%s%s_csv.zip' % (self.base_url, label, date.strftime('%Y%m01'), label)
+
     def fetch_csvs(self, date, label):
         # construct url
-        datestr = date.strftime('%Y%m%d')
-        url = '%s/%s/%s%s.csv' % (self.base_url, label, datestr, label)
+        url = self.daily_csv_url(date, label)
 
         # make request
         response = self.request(url)
@@ -162,8 +251,7 @@ class NYISOClient(BaseClient):
             return [response.text]
 
         # if failure, try zipped monthly data
-        datestr = date.strftime('%Y%m01')
-        url = '%s/%s/%s%s_csv.zip' % (self.base_url, label, datestr, label)
+        url = self.monthly_zip_url(date, label)
 
         # make request and unzip
         response_zipped = self.request(url)
@@ -181,21 +269,18 @@ class NYISOClient(BaseClient):
 
     def parse_load_rtm(self, content):
         # parse csv to df
-        df = self.parse_to_df(content, header=0, index_col=0, parse_dates=True)
+        df = self.parse_to_df(content, usecols=['Time Stamp', 'Time Zone', 'Load'], dtype={'Load': np.float64})
 
         # set index
-        df.index = self.utcify_index(df.index, tz_col=df['Time Zone'])
-        df['timestamp'] = df.index
-
-        # total load grouped by timestamp
         try:
-            total_loads = df.groupby('timestamp').aggregate(np.sum)
+            index = self.utcify_index(self.parse_timestamps(df['Time Stamp']), tz_col=df['Time Zone'])
         except KeyError:
             raise ValueError('Could not parse content:\n%s' % str(content))
 
-        # pull out column
-        series = total_loads['Load']
+        # total load grouped by timestamp
+        series = pd.Series(df['Load'].values, index=index).groupby(level=0).sum()
         final_df = pd.DataFrame({'load_MW': series})
+        final_df.index.name = 'timestamp'
 
         # return
         return final_df
@@ -216,15 +301,13 @@ class NYISOClient(BaseClient):
 
     def parse_trade(self, content):
         # parse csv to df
-        df = self.parse_to_df(content)
+        df = self.parse_to_df(content, usecols=['Timestamp', 'Interface Name', 'Flow (MWH)'],
+                              dtype={'Flow (MWH)': np.float64})
         try:
             df.drop_duplicates(['Timestamp', 'Interface Name'], inplace=True)
         except KeyError:
             raise ValueError('Could not parse content:\n%s' % content)
 
-        # pivot
-        pivoted = df.pivot(index='Timestamp', columns='Interface Name', values='Flow (MWH)')
-
         # only keep flows across external interfaces
         interfaces = [
             'SCH - HQ - NY', 'SCH - HQ_CEDARS', 'SCH - HQ_IMPORT_EXPORT',  # HQ
@@ -232,40 +315,59 @@ class NYISOClient(BaseClient):
             'SCH - OH - NY',  # Ontario
             'SCH - PJ - NY', 'SCH - PJM_HTP', 'SCH - PJM_NEPTUNE', 'SCH - PJM_VFT',  # PJM
         ]
-        subsetted = pivoted[interfaces].copy()
+        df = df[df['Interface Name'].isin(interfaces)].copy()
 
-        # set index
-        subsetted['timestamp'] = subsetted.index.map(pd.to_datetime)
-        subsetted.set_index('timestamp', inplace=True)
-        subsetted.index = self.utcify_index(subsetted.index)
-        subsetted.index.set_names(['timestamp'], inplace=True)
+        # pivot to a timestamp by interface matrix
+        df['timestamp'] = self.parse_timestamps(df['Timestamp'])
+        pivoted = df.pivot(index='timestamp', columns='Interface Name', values='Flow (MWH)')
+        flows = pivoted[interfaces].values
 
-        # sum up
-        cleaned = subsetted.dropna(axis=0)
-        series = cleaned.apply(lambda x: -1*np.sum(x), axis=1)
-        final_df = pd.DataFrame({'net_exp_MW': series})
+        # sum up rows with every interface reported
+        complete = ~np.isnan(flows).any(axis=1)
+        index = self.utcify_index(pivoted.index[complete])
+        index.name = 'timestamp'
+        final_df = pd.DataFrame({'net_exp_MW': -flows[complete].sum(axis=1)}, index=index)
 
         # return
         return final_df
 
     def parse_genmix(self, content):
         # parse csv to df
-        df = self.parse_to_df(content, header=0, index_col=0, parse_dates=True)
+        df = self.parse_to_df(content)
 
         # set index
-        df.index = self.utcify_index(df.index, tz_col=df['Time Zone'])
-        df.index.name = 'timestamp'
+        index = self.utcify_index(self.parse_timestamps(df['Time Stamp']), tz_col=df['Time Zone'])
+        index.name = 'timestamp'
 
-        # convert fuel names
-        df['fuel_name'] = df.apply(lambda x: self.fuel_names[x['Fuel Category']],
-                                   axis=1)
+        # convert fuel names once per category
+        codes, categories = pd.factorize(df['Fuel Category'])
+        fuel_names = np.array([self.fuel_names[category] for category in categories], dtype=object)
 
         # assemble final
         try:
-            final_df = pd.DataFrame({'gen_MW': df['Gen MW'], 'fuel_name': df['fuel_name']})
+            gen = df['Gen MW'].values
         except KeyError:
             LOGGER.info('Falling back to legacy rtfuelmix column header names.')
-            final_df = pd.DataFrame({'gen_MW': df['Gen MWh'], 'fuel_name': df['fuel_name']})
+            gen = df['Gen MWh'].values
+        final_df = pd.DataFrame({'gen_MW': gen, 'fuel_name': fuel_names[codes]}, index=index)
 
         # return
         return final_df
+
+    def parse_timestamps(self, values):
+        """
+        Parse NYISO 'MM/DD/YYYY HH:MM[:SS]' timestamp strings, converting each distinct string once.
+
+        :param values: Array-like of timestamp strings.
+        :return: DatetimeIndex of naive local times.
+        """
+        codes, uniques = pd.factorize(np.asarray(values))
+        for fmt in ['%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M']:
+            try:
+                parsed = pd.to_datetime(uniques, format=fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            parsed = pd.to_datetime(uniques)
+        return pd.DatetimeIndex(parsed[codes])
@@ -0,0 +1,52 @@
+"""
+Compare the BeautifulSoup and lxml iterparse readers for CAISO OASIS XML.
+
+The fixture's REPORT_DATA records are repeated to approximate a multi-day ENE_SLRS pull.
+Run from the repository root:
+
+    python -m tests.benchmarks.benchmark_caiso_oasis
+"""
+import re
+import timeit
+
+from bs4 import BeautifulSoup
+
+from pyiso import client_factory
+from tests import read_fixture
+
+REPEATS = 2000
+
+
+def make_document(n_repeats):
+    xml = read_fixture('caiso', 'ene_slrs.xml')
+    records = ''.join(re.findall(r'<REPORT_DATA>.*?</REPORT_DATA>\s*', xml, re.S))
+    start = xml.index('<REPORT_DATA>')
+    return (xml[:start] + records * n_repeats + xml[start:]).encode('utf-8')
+
+
+def read_with_soup(content):
+    """The reader used before: build the full tree, then look up each field per record."""
+    values = []
+    for dp in BeautifulSoup(content, 'xml').find_all(['REPORT_DATA', 'report_data']):
+        values.append((dp.find(['DATA_ITEM', 'data_item']).string,
+                       dp.find(['INTERVAL_START_GMT', 'interval_start_gmt']).string,
+                       float(dp.find(['VALUE', 'value']).string)))
+    return values
+
+
+def main():
+    client = client_factory('CAISO')
+    content = make_document(REPEATS)
+
+    n_records = len(client.parse_oasis_xml(content))
+    soup_sec = min(timeit.repeat(lambda: read_with_soup(content), number=1, repeat=3))
+    lxml_sec = min(timeit.repeat(lambda: client.parse_oasis_xml(content), number=1, repeat=3))
+
+    print('%d REPORT_DATA records, %.1f kB' % (n_records, len(content) / 1000.))
+    print('BeautifulSoup: %.3f s' % soup_sec)
+    print('lxml iterparse: %.3f s' % lxml_sec)
+    print('speedup: %.1fx' % (soup_sec / lxml_sec))
+
+
+if __name__ == '__main__':
+    main()
@@ -39,15 +39,10 @@ class IntegrationTestCAISOClient(TestCase):
         payload.update(self.c.base_payload)
         data = self.c.fetch_oasis(payload=payload)
         self.assertEqual(len(data), 5)
-        self.assertEqual(str(data[0]).lower(), '<report_data>\n\
-<data_item>SYS_FCST_DA_MW</data_item>\n\
-<resource_name>CA ISO-TAC</resource_name>\n\
-<opr_date>2014-05-08</opr_date>\n\
-<interval_num>13</interval_num>\n\
-<interval_start_gmt>2014-05-08T19:00:00-00:00</interval_start_gmt>\n\
-<interval_end_gmt>2014-05-08T20:00:00-00:00</interval_end_gmt>\n\
-<value>26559.38</value>\n\
-</report_data>'.lower())
+        self.assertEqual(data['data_item'][0].lower(), 'sys_fcst_da_mw')
+        self.assertEqual(data['resource_name'][0].lower(), 'ca iso-tac')
+        self.assertEqual(data['interval_start_gmt'][0].lower(), '2014-05-08t19:00:00-00:00')
+        self.assertEqual(data['value'][0], 26559.38)
 
     def test_fetch_oasis_demand_rtm(self):
         ts = self.c.utcify('2014-05-08 12:00')
@@ -59,15 +54,10 @@ class IntegrationTestCAISOClient(TestCase):
         payload.update(self.c.base_payload)
         data = self.c.fetch_oasis(payload=payload)
         self.assertEqual(len(data), 55)
-        self.assertEqual(str(data[0]).lower(), '<report_data>\n\
-<data_item>sys_fcst_15min_mw</data_item>\n\
-<resource_name>ca iso-tac</resource_name>\n\
-<opr_date>2014-05-08</opr_date>\n\
-<interval_num>49</interval_num>\n\
-<interval_start_gmt>2014-05-08t19:00:00-00:00</interval_start_gmt>\n\
-<interval_end_gmt>2014-05-08t19:15:00-00:00</interval_end_gmt>\n\
-<value>26731</value>\n\
-</report_data>'.lower())
+        self.assertEqual(data['data_item'][0].lower(), 'sys_fcst_15min_mw')
+        self.assertEqual(data['resource_name'][0].lower(), 'ca iso-tac')
+        self.assertEqual(data['interval_start_gmt'][0].lower(), '2014-05-08t19:00:00-00:00')
+        self.assertEqual(data['value'][0], 26731)
 
     def test_fetch_oasis_ren_dam(self):
         ts = self.c.utcify('2014-05-08 12:00')
@@ -79,16 +69,10 @@ class IntegrationTestCAISOClient(TestCase):
         payload.update(self.c.base_payload)
         data = self.c.fetch_oasis(payload=payload)
         self.assertEqual(len(data), 4)
-        self.assertEqual(str(data[0]).lower(), '<report_data>\n\
-<data_item>RENEW_FCST_DA_MW</data_item>\n\
-<opr_date>2014-05-08</opr_date>\n\
-<interval_num>13</interval_num>\n\
-<interval_start_gmt>2014-05-08T19:00:00-00:00</interval_start_gmt>\n\
-<interval_end_gmt>2014-05-08T20:00:00-00:00</interval_end_gmt>\n\
-<value>813.7</value>\n\
-<trading_hub>NP15</trading_hub>\n\
-<renewable_type>Solar</renewable_type>\n\
-</report_data>'.lower())
+        self.assertEqual(data['data_item'][0].lower(), 'renew_fcst_da_mw')
+        self.assertEqual(data['interval_start_gmt'][0].lower(), '2014-05-08t19:00:00-00:00')
+        self.assertEqual(data['value'][0], 813.7)
+        self.assertEqual(data['renewable_type'][0].lower(), 'solar')
 
     def test_fetch_oasis_slrs_dam(self):
         ts = self.c.utcify('2014-05-08 12:00')
@@ -100,12 +84,7 @@ class IntegrationTestCAISOClient(TestCase):
         payload.update(self.c.base_payload)
         data = self.c.fetch_oasis(payload=payload)
         self.assertEqual(len(data), 17)
-        self.assertEqual(str(data[0]).lower(), '<report_data>\n\
-<data_item>ISO_TOT_EXP_MW</data_item>\n\
-<resource_name>Caiso_Totals</resource_name>\n\
-<opr_date>2014-05-08</opr_date>\n\
-<interval_num>13</interval_num>\n\
-<interval_start_gmt>2014-05-08T19:00:00-00:00</interval_start_gmt>\n\
-<interval_end_gmt>2014-05-08T20:00:00-00:00</interval_end_gmt>\n\
-<value>1044</value>\n\
-</report_data>'.lower())
+        self.assertEqual(data['data_item'][0].lower(), 'iso_tot_exp_mw')
+        self.assertEqual(data['resource_name'][0].lower(), 'caiso_totals')
+        self.assertEqual(data['interval_start_gmt'][0].lower(), '2014-05-08t19:00:00-00:00')
+        self.assertEqual(data['value'][0], 1044)
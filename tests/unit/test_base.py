@@ -1,8 +1,12 @@
 from unittest import TestCase
-from pyiso.base import BaseClient
+from pyiso.base import BaseClient, concurrent_map
 from datetime import datetime, timedelta
+import shutil
+import tempfile
+import threading
 import pytz
 import pandas as pd
+import requests_mock
 
 
 class TestBaseClient(TestCase):
@@ -119,3 +123,241 @@ class TestBaseClient(TestCase):
     def test_timeout(self):
         bc = BaseClient(timeout_seconds=30)
         self.assertEqual(bc.timeout_seconds, 30)
+
+    def test_concurrent_map_keeps_order(self):
+        result = concurrent_map(lambda x: x * 2, range(20), max_workers=5)
+        self.assertEqual(result, [x * 2 for x in range(20)])
+
+    def test_session_is_pooled(self):
+        bc = BaseClient()
+        session = bc.get_session()
+        self.assertIs(bc.get_session(), session)
+        self.assertEqual(session.get_adapter('https://example.com')._pool_maxsize, bc.MAX_CONCURRENT_REQUESTS)
+
+    @requests_mock.Mocker()
+    def test_request_many(self, mock_request):
+        urls = ['http://example.com/%d' % i for i in range(6)]
+        for i, url in enumerate(urls):
+            mock_request.get(url, text=str(i))
+
+        bc = BaseClient()
+        responses = bc.request_many(urls, max_workers=3)
+        self.assertEqual([r.text for r in responses], [str(i) for i in range(6)])
+
+    def test_get_generation_async(self):
+        class EchoClient(BaseClient):
+            def get_generation(self, **kwargs):
+                self.handle_options(**kwargs)
+                return [self.options['test']]
+
+        bc = EchoClient()
+        first = bc.get_generation_async(test='a')
+        second = bc.get_generation_async(test='b')
+        self.assertEqual(first.get(timeout=5), ['a'])
+        self.assertEqual(second.get(timeout=5), ['b'])
+        self.assertEqual(bc.options, {})
+
+    def test_get_async_shares_pool(self):
+        class CountingClient(BaseClient):
+            def get_load(self, **kwargs):
+                return [threading.current_thread().name]
+
+        bc = CountingClient()
+        threads_before = threading.active_count()
+        results = [bc.get_load_async() for _ in range(20)]
+        names = set(name for result in results for name in result.get(timeout=5))
+
+        # the calls run on one bounded pool rather than a new pool each
+        self.assertLessEqual(len(names), BaseClient.MAX_CONCURRENT_REQUESTS)
+        self.assertLessEqual(threading.active_count() - threads_before, BaseClient.MAX_CONCURRENT_REQUESTS + 3)
+
+    def test_utcify_array_naive_strings(self):
+        bc = BaseClient()
+        bc.TZ_NAME = 'America/New_York'
+        idx = bc.utcify_array(['2017-11-04 00:00', '2017-11-04 01:00'])
+        self.assertEqual(list(idx), [datetime(2017, 11, 4, 4, tzinfo=pytz.utc),
+                                     datetime(2017, 11, 4, 5, tzinfo=pytz.utc)])
+
+    def test_utcify_array_matches_utcify(self):
+        bc = BaseClient()
+        bc.TZ_NAME = 'America/Los_Angeles'
+        ts_strs = ['2014-05-08 12:00', '2014-12-08 12:00', '2014-05-08T12:00-0400']
+        idx = bc.utcify_array(ts_strs[:2])
+        self.assertEqual(list(idx), [bc.utcify(ts_str) for ts_str in ts_strs[:2]])
+        idx = bc.utcify_array(ts_strs[2:])
+        self.assertEqual(list(idx), [bc.utcify(ts_strs[2])])
+
+    def test_utcify_array_is_dst(self):
+        bc = BaseClient()
+        bc.TZ_NAME = 'America/New_York'
+        idx = bc.utcify_array(['2017-11-05 01:00', '2017-11-05 01:00'], is_dst=[True, False])
+        self.assertEqual(list(idx), [datetime(2017, 11, 5, 5, tzinfo=pytz.utc),
+                                     datetime(2017, 11, 5, 6, tzinfo=pytz.utc)])
+
+    def test_utcify_array_is_dst_spring_forward(self):
+        bc = BaseClient()
+        bc.TZ_NAME = 'America/New_York'
+        ts_strs = ['2017-03-12 01:30', '2017-03-12 02:30', '2017-03-12 03:30']
+        idx = bc.utcify_array(ts_strs, is_dst=[False, True, True])
+        self.assertEqual(list(idx), [bc.utcify(ts_strs[0], is_dst=False),
+                                     bc.utcify(ts_strs[1], is_dst=True),
+                                     bc.utcify(ts_strs[2], is_dst=True)])
+
+    def test_utcify_array_format(self):
+        bc = BaseClient()
+        idx = bc.utcify_array(['20171122T05Z', '20171122T06Z'], tz_name='UTC', fmt='%Y%m%dT%HZ')
+        self.assertEqual(list(idx), [datetime(2017, 11, 22, 5, tzinfo=pytz.utc),
+                                     datetime(2017, 11, 22, 6, tzinfo=pytz.utc)])
+
+    def test_utcify_array_empty(self):
+        bc = BaseClient()
+        self.assertEqual(len(bc.utcify_array([])), 0)
+
+    def test_utcify_index_tz_col(self):
+        bc = BaseClient()
+        bc.TZ_NAME = 'America/New_York'
+        local_index = pd.DatetimeIndex(['2017-07-01 12:00', '2017-07-01 12:00', '2017-07-01 12:00', '2017-07-01 13:00'])
+        tz_col = pd.Series(['EST', 'EDT', 'America/Chicago', 'EST'], index=local_index)
+        idx = bc.utcify_index(local_index, tz_col=tz_col)
+
+        # EDT is not a pytz timezone, so it falls back to the client timezone
+        self.assertEqual(list(idx), [datetime(2017, 7, 1, 17, tzinfo=pytz.utc),
+                                     datetime(2017, 7, 1, 16, tzinfo=pytz.utc),
+                                     datetime(2017, 7, 1, 17, tzinfo=pytz.utc),
+                                     datetime(2017, 7, 1, 18, tzinfo=pytz.utc)])
+
+    def test_utcify_index_tz_col_spring_forward(self):
+        bc = BaseClient()
+        bc.TZ_NAME = 'America/New_York'
+        local_index = pd.DatetimeIndex(['2017-03-12 01:00', '2017-03-12 02:00', '2017-03-12 03:00',
+                                        '2017-03-12 02:00'])
+        tz_col = pd.Series(['America/New_York', 'America/New_York', 'America/New_York', 'America/Chicago'])
+        idx = bc.utcify_index(local_index, tz_col=tz_col)
+
+        # the skipped hour is read as standard time, as pytz localize does
+        self.assertEqual(list(idx), [datetime(2017, 3, 12, 6, tzinfo=pytz.utc),
+                                     datetime(2017, 3, 12, 7, tzinfo=pytz.utc),
+                                     datetime(2017, 3, 12, 7, tzinfo=pytz.utc),
+                                     datetime(2017, 3, 12, 8, tzinfo=pytz.utc)])
+
+    def test_csv_engine(self):
+        bc = BaseClient()
+        self.assertEqual(bc.csv_engine(), 'c')
+        self.assertEqual(bc.csv_engine(delimiter='\t'), 'c')
+        self.assertEqual(bc.csv_engine(sep=r'\s+'), 'c')
+        self.assertEqual(bc.csv_engine(delimiter='\t+'), 'python')
+        self.assertEqual(bc.csv_engine(sep=None), 'python')
+        self.assertEqual(bc.csv_engine(skipfooter=1), 'python')
+
+    def test_parse_to_df_bytes(self):
+        bc = BaseClient()
+        content = b'a,b,c\n1,2.5,x\n2,,y\n'
+        df = bc.parse_to_df(content, usecols=['a', 'b'], dtype={'a': 'int64', 'b': 'float64'})
+        self.assertEqual(list(df.columns), ['a', 'b'])
+        self.assertEqual(len(df), 1)
+        self.assertEqual(df['a'].dtype.name, 'int64')
+
+        df = bc.parse_to_df(content, dropna=False)
+        self.assertEqual(len(df), 2)
+
+    def _frame_client(self):
+        class FrameClient(BaseClient):
+            NAME = 'TEST'
+
+            def get_generation(self, **kwargs):
+                self.handle_options(**kwargs)
+                df = pd.DataFrame({'fuel_name': ['wind', 'solar'], 'gen_MW': [1.0, 2.0]},
+                                  index=pd.DatetimeIndex(['2017-07-01 12:00', '2017-07-01 12:00'],
+                                                         tz='UTC', name='timestamp'))
+                return self.serialize_faster(df, extras={'ba_name': self.NAME, 'market': self.MARKET_CHOICES.hourly})
+
+            def get_load(self, **kwargs):
+                self.handle_options(**kwargs)
+                return [{'timestamp': datetime(2017, 7, 1, 12, tzinfo=pytz.utc), 'ba_name': self.NAME, 'load_MW': 1.0}]
+
+        return FrameClient()
+
+    def test_get_generation_frame(self):
+        bc = self._frame_client()
+        df = bc.get_generation_frame(latest=True)
+        self.assertIsInstance(df, pd.DataFrame)
+        self.assertEqual(df['ba_name'].dtype.name, 'category')
+        self.assertEqual(df['fuel_name'].dtype.name, 'category')
+        self.assertEqual(df.to_dict(orient='records'), bc.get_generation(latest=True))
+
+    def test_get_load_frame_from_records(self):
+        bc = self._frame_client()
+        df = bc.get_load_frame(latest=True)
+        self.assertEqual(df['ba_name'].dtype.name, 'category')
+        self.assertEqual(df.to_dict(orient='records'), bc.get_load(latest=True))
+
+    def test_concat_frames(self):
+        bc = self._frame_client()
+        gen = bc.get_generation_frame(latest=True)
+        load = bc.get_load_frame(latest=True)
+        load['ba_name'] = load['ba_name'].cat.rename_categories(['OTHER'])
+        df = bc.concat_frames([gen, load])
+
+        self.assertEqual(len(df), 3)
+        self.assertEqual(df['ba_name'].dtype.name, 'category')
+        self.assertEqual(list(df['ba_name']), ['TEST', 'TEST', 'OTHER'])
+        self.assertEqual(list(df['fuel_name'][:2]), ['wind', 'solar'])
+
+    def test_iter_load_windows(self):
+        class HourlyClient(BaseClient):
+            ITER_WINDOW = timedelta(hours=6)
+
+            def get_load(self, start_at=None, end_at=None, **kwargs):
+                self.handle_options(start_at=start_at, end_at=end_at, **kwargs)
+                timestamps = pd.date_range(self.options['start_at'], self.options['end_at'], freq='1h')
+                return [{'timestamp': ts, 'load_MW': 1.0} for ts in timestamps]
+
+        bc = HourlyClient()
+        start_at = datetime(2017, 7, 1, tzinfo=pytz.utc)
+        chunks = list(bc.iter_load(start_at=start_at, end_at=start_at + timedelta(days=1)))
+        self.assertEqual(len(chunks), 4)
+        timestamps = [d['timestamp'] for chunk in chunks for d in chunk]
+        self.assertEqual(timestamps, list(pd.date_range(start_at, start_at + timedelta(days=1), freq='1h')))
+
+    @requests_mock.Mocker()
+    def test_request_cached(self, mock_request):
+        mock_request.get('http://example.com/data', text='data')
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+
+        bc = BaseClient()
+        bc.enable_cache(cache_dir)
+        self.assertEqual(bc.request('http://example.com/data', params={'a': 1}).text, 'data')
+        response = bc.request('http://example.com/data', params={'a': 1})
+        self.assertEqual(response.text, 'data')
+        self.assertTrue(response.from_cache)
+        self.assertEqual(mock_request.call_count, 1)
+
+        bc.request('http://example.com/data', params={'a': 2})
+        self.assertEqual(mock_request.call_count, 2)
+
+    @requests_mock.Mocker()
+    def test_request_defer_cache(self, mock_request):
+        mock_request.get('http://example.com/data', text='data')
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+
+        bc = BaseClient()
+        bc.enable_cache(cache_dir)
+        response = bc.request('http://example.com/data', params={'a': 1}, defer_cache=True)
+        self.assertIsNone(bc.get_cache().get('http://example.com/data?a=1'))
+
+        # only stored once the caller has checked it
+        bc.cache_response('http://example.com/data', response, params={'a': 1})
+        self.assertTrue(bc.request('http://example.com/data', params={'a': 1}, defer_cache=True).from_cache)
+        self.assertEqual(mock_request.call_count, 1)
+
+    def test_cache_expire_after(self):
+        class DatedClient(BaseClient):
+            CACHE_DATED_URLS = [(r'/(\d{8})\.csv$', '%Y%m%d', timedelta(days=2))]
+
+        bc = DatedClient()
+        today = datetime.utcnow().strftime('%Y%m%d')
+        self.assertIsNone(bc.cache_expire_after('http://example.com/20170101.csv'))
+        self.assertEqual(bc.cache_expire_after('http://example.com/%s.csv' % today), bc.CACHE_EXPIRE_AFTER)
+        self.assertEqual(bc.cache_expire_after('http://example.com/latest.csv'), bc.CACHE_EXPIRE_AFTER)
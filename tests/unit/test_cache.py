@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import TestCase
+
+import mock
+import requests
+
+from pyiso.cache import ResponseCache
+
+
+class TestResponseCache(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = ResponseCache(self.cache_dir, max_size_bytes=10 * 1024)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def make_response(self, content):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = content
+        return response
+
+    def test_get_set(self):
+        self.cache.set('http://example.com/a', self.make_response(b'a'))
+        response = self.cache.get('http://example.com/a')
+        self.assertEqual(response.content, b'a')
+        self.assertTrue(response.from_cache)
+        self.assertIsNone(self.cache.get('http://example.com/b'))
+
+    def test_expired(self):
+        self.cache.set('http://example.com/a', self.make_response(b'a'), expire_after=timedelta(minutes=5))
+        self.cache.set('http://example.com/b', self.make_response(b'b'), expire_after=timedelta(microseconds=1))
+        self.assertEqual(self.cache.get('http://example.com/a').content, b'a')
+        self.assertIsNone(self.cache.get('http://example.com/b'))
+
+    def test_incompatible_entry_is_a_miss(self):
+        # a pickle referring to a class that no longer exists
+        with open(self.cache._path('http://example.com/a'), 'wb') as f:
+            f.write(b'cpyiso.cache\nNoSuchClass\n.')
+        self.assertIsNone(self.cache.get('http://example.com/a'))
+        self.assertFalse(os.path.exists(self.cache._path('http://example.com/a')))
+
+    def test_evicted_while_reading(self):
+        self.cache.set('http://example.com/a', self.make_response(b'a'))
+        with mock.patch('os.utime', side_effect=OSError('evicted')):
+            self.assertEqual(self.cache.get('http://example.com/a').content, b'a')
+
+        os.remove(self.cache._path('http://example.com/a'))
+        self.assertIsNone(self.cache.get('http://example.com/a'))
+
+    def test_evicts_least_recently_used(self):
+        content = b'x' * 4 * 1024
+        for i, name in enumerate(['a', 'b']):
+            self.cache.set('http://example.com/' + name, self.make_response(content))
+            os.utime(self.cache._path('http://example.com/' + name), (i, i))
+
+        # using a makes b the least recently used
+        self.cache.get('http://example.com/a')
+        self.cache.set('http://example.com/c', self.make_response(content))
+
+        self.assertIsNotNone(self.cache.get('http://example.com/a'))
+        self.assertIsNone(self.cache.get('http://example.com/b'))
+        self.assertIsNotNone(self.cache.get('http://example.com/c'))
+
+    def test_evicts_array_files(self):
+        array_path = os.path.join(self.cache_dir, 'table.npy')
+        with open(array_path, 'wb') as f:
+            f.write(b'x' * 8 * 1024)
+        os.utime(array_path, (0, 0))
+
+        # stored arrays count towards the size limit, and go first when least recently used
+        self.cache.set('http://example.com/a', self.make_response(b'x' * 4 * 1024))
+
+        self.assertFalse(os.path.exists(array_path))
+        self.assertIsNotNone(self.cache.get('http://example.com/a'))
@@ -1,8 +1,13 @@
 from datetime import date, datetime, timedelta
+from io import BytesIO
 from unittest import TestCase, skip
 from pandas import Timestamp
 import pandas as pd
+import mock
 import pytz
+import shutil
+import tempfile
+import zipfile
 import requests_mock
 from bs4 import BeautifulSoup
 from dateutil.parser import parse
@@ -16,6 +21,7 @@ class TestCAISOBase(TestCase):
         self.c = client_factory('CAISO')
         self.ren_report_tsv = read_fixture(self.c.__module__, 'ren_report.csv')
         self.sld_fcst_xml = read_fixture(self.c.__module__, 'sld_forecast.xml')
+        self.sld_fcst_csv = read_fixture(self.c.__module__, 'sld_forecast.csv')
         self.ene_slrs_xml = read_fixture(self.c.__module__, 'ene_slrs.xml')
         self.sld_ren_fcst_xml = read_fixture(self.c.__module__, 'sld_ren_forecast.xml')
         self.systemconditions_html = read_fixture(self.c.__module__, 'systemconditions.html')
@@ -69,8 +75,7 @@ class TestCAISOBase(TestCase):
 
     def test_parse_oasis_demand_rtm(self):
         # set up list of data
-        soup = BeautifulSoup(self.sld_fcst_xml, 'xml')
-        data = soup.find_all('REPORT_DATA')
+        data = self.c.parse_oasis_xml(self.sld_fcst_xml)
 
         # parse
         self.c.handle_options(market=self.c.MARKET_CHOICES.fivemin, freq=self.c.FREQUENCY_CHOICES.fivemin)
@@ -84,6 +89,137 @@ class TestCAISOBase(TestCase):
                     'load_MW': 26755.0}
         self.assertEqual(expected, parsed_data[0])
 
+    def test_parse_oasis_xml(self):
+        data = self.c.parse_oasis_xml(self.sld_ren_fcst_xml)
+        self.assertEqual(len(data), 4)
+        self.assertEqual(data['renewable_type'][0], 'Solar')
+        self.assertEqual(data['value'][0], 0.01)
+        self.assertEqual(data['timestamp'][0], datetime(2013, 9, 19, 7, 0, tzinfo=pytz.utc))
+
+    def test_parse_oasis_xml_error(self):
+        error_xml = '<?xml version="1.0" encoding="UTF-8"?>' \
+                    '<OASISReport xmlns="http://www.caiso.com/soa/OASISReport_v1.xsd"><MessagePayload><RTO>' \
+                    '<ERROR><ERR_CODE>1004</ERR_CODE><ERR_DESC>No data returned</ERR_DESC></ERROR>' \
+                    '</RTO></MessagePayload></OASISReport>'
+        data = self.c.parse_oasis_xml(error_xml)
+        self.assertEqual(len(data), 0)
+
+    @requests_mock.Mocker()
+    def test_fetch_oasis_caches_only_valid_responses(self, mock_request):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.c.enable_cache(cache_dir)
+
+        def zipped(content):
+            f = BytesIO()
+            with zipfile.ZipFile(f, 'w') as z:
+                z.writestr('report.xml', content)
+            return f.getvalue()
+
+        error_xml = '<?xml version="1.0" encoding="UTF-8"?>' \
+                    '<OASISReport xmlns="http://www.caiso.com/soa/OASISReport_v1.xsd"><MessagePayload><RTO>' \
+                    '<ERROR><ERR_CODE>1015</ERR_CODE><ERR_DESC>Too many requests</ERR_DESC></ERROR>' \
+                    '</RTO></MessagePayload></OASISReport>'
+        mock_request.get(self.c.base_url_oasis, [{'content': zipped(error_xml)},
+                                                 {'content': zipped(error_xml.lower())},
+                                                 {'content': zipped(self.sld_fcst_xml)}])
+
+        # a past query, which would be kept until evicted
+        payload = {'queryname': 'SLD_FCST', 'startdatetime': '20140101T08:00-0000',
+                   'enddatetime': '20140102T08:00-0000'}
+        self.assertEqual(len(self.c.fetch_oasis(payload=payload)), 0)
+        self.assertEqual(len(self.c.fetch_oasis(payload=payload)), 0)
+        self.assertEqual(len(self.c.fetch_oasis(payload=payload)), 3)
+        self.assertEqual(len(self.c.fetch_oasis(payload=payload)), 3)
+        self.assertEqual(mock_request.call_count, 3)
+
+    def test_oasis_payload_csv(self):
+        self.c.handle_options(start_at='2014-01-01', end_at='2014-02-01', market=self.c.MARKET_CHOICES.fivemin,
+                              data='load', oasis_format='csv')
+        constructed = self.c.construct_oasis_payload('SLD_FCST')
+        self.assertEqual(constructed['resultformat'], 6)
+
+    def test_parse_oasis_csv_matches_xml(self):
+        from_csv = self.c.parse_oasis_csv(self.sld_fcst_csv)
+        from_xml = self.c.parse_oasis_xml(self.sld_fcst_xml)
+        self.assertEqual(list(from_csv.columns), list(from_xml.columns))
+        for col in ['data_item', 'resource_name', 'value', 'timestamp']:
+            self.assertEqual(list(from_csv[col]), list(from_xml[col]))
+
+    def test_parse_oasis_csv_aliased_columns(self):
+        # a header with two columns for each of data_item, resource_name and value
+        csv = 'INTERVALSTARTTIME_GMT,DATA_ITEM,XML_DATA_ITEM,TAC_AREA_NAME,RESOURCE_NAME,VALUE,MW\n' \
+              '2014-05-08T18:55:00-00:00,Demand,SYS_FCST_5MIN_MW,CA ISO-TAC,CA ISO-TAC,0,26755\n'
+        data = self.c.parse_oasis_csv(csv)
+
+        self.assertEqual(list(data.columns), self.c.oasis_fields + ['timestamp'])
+        self.assertEqual(list(data['data_item']), ['SYS_FCST_5MIN_MW'])
+        self.assertEqual(list(data['resource_name']), ['CA ISO-TAC'])
+        self.assertEqual(list(data['value']), [26755.0])
+
+    def test_parse_oasis_demand_rtm_csv(self):
+        data = self.c.parse_oasis_csv(self.sld_fcst_csv)
+
+        self.c.handle_options(market=self.c.MARKET_CHOICES.fivemin, freq=self.c.FREQUENCY_CHOICES.fivemin)
+        parsed_data = self.c.parse_oasis_demand_forecast(data)
+
+        self.assertEqual(len(parsed_data), 1)
+        expected = {'ba_name': 'CAISO',
+                    'timestamp': datetime(2014, 5, 8, 18, 55, tzinfo=pytz.utc),
+                    'freq': '5m', 'market': 'RT5M',
+                    'load_MW': 26755.0}
+        self.assertEqual(expected, parsed_data[0])
+
+    def test_split_oasis_payload(self):
+        self.c.handle_options(start_at='2014-01-01', end_at='2014-03-15', market=self.c.MARKET_CHOICES.fivemin,
+                              data='load')
+        payloads = self.c.split_oasis_payload(self.c.construct_oasis_payload('SLD_FCST'))
+
+        self.assertEqual([(p['startdatetime'], p['enddatetime']) for p in payloads],
+                         [('20140101T08:00-0000', '20140201T08:00-0000'),
+                          ('20140201T08:00-0000', '20140304T08:00-0000'),
+                          ('20140304T08:00-0000', '20140315T07:00-0000')])
+        for p in payloads:
+            self.assertEqual(p['queryname'], 'SLD_FCST')
+
+    def test_split_oasis_payload_short(self):
+        self.c.handle_options(start_at='2014-01-01', end_at='2014-01-02', data='load')
+        payload = self.c.construct_oasis_payload('SLD_FCST')
+        self.assertEqual(self.c.split_oasis_payload(payload), [payload])
+
+    def test_fetch_oasis_data_stitches_windows(self):
+        self.c.handle_options(start_at='2014-01-01', end_at='2014-03-01', market=self.c.MARKET_CHOICES.fivemin,
+                              data='load')
+        payload = self.c.construct_oasis_payload('SLD_FCST')
+
+        # every window returns the same records, as if they overlapped completely
+        with mock.patch.object(self.c, 'fetch_oasis') as mock_fetch:
+            mock_fetch.return_value = self.c.parse_oasis_xml(self.sld_fcst_xml)
+            data = self.c.fetch_oasis_data(payload)
+
+        self.assertEqual(mock_fetch.call_count, 2)
+        self.assertEqual(len(data), 3)
+
+    def test_fetch_oasis_data_keeps_trading_hubs(self):
+        self.c.handle_options(start_at='2013-09-01', end_at='2013-10-15', market=self.c.MARKET_CHOICES.dam,
+                              freq=self.c.FREQUENCY_CHOICES.dam, data='gen')
+        payload = self.c.construct_oasis_payload('SLD_REN_FCST')
+
+        # the same hours for two trading hubs, with no resource name to tell them apart
+        np15 = self.c.parse_oasis_xml(self.sld_ren_fcst_xml)
+        sp15 = self.c.parse_oasis_xml(self.sld_ren_fcst_xml.replace('NP15', 'SP15'))
+        window_data = pd.concat([np15, sp15], ignore_index=True)
+
+        with mock.patch.object(self.c, 'fetch_oasis') as mock_fetch:
+            mock_fetch.return_value = window_data
+            data = self.c.fetch_oasis_data(payload)
+
+        self.assertEqual(mock_fetch.call_count, 2)
+        self.assertEqual(len(data), len(window_data))
+        parsed_data = self.c.parse_oasis_renewable(data)
+        self.assertEqual(parsed_data, self.c.parse_oasis_renewable(window_data))
+        self.assertEqual(parsed_data[0]['gen_MW'], 2 * 478.86)
+
     def test_parse_todays_outlook_renewables(self):
         # set up soup and ts
         soup = BeautifulSoup(self.todays_outlook_renewables, 'lxml')
@@ -114,8 +250,7 @@ class TestCAISOBase(TestCase):
 
     def test_parse_oasis_slrs_gen_rtm(self):
         # set up list of data
-        soup = BeautifulSoup(self.ene_slrs_xml, 'xml')
-        data = soup.find_all('REPORT_DATA')
+        data = self.c.parse_oasis_xml(self.ene_slrs_xml)
 
         # parse
         self.c.handle_options(data='gen', market=self.c.MARKET_CHOICES.fivemin, freq=self.c.FREQUENCY_CHOICES.fivemin)
@@ -131,8 +266,7 @@ class TestCAISOBase(TestCase):
 
     def test_parse_oasis_slrs_trade_dam(self):
         # set up list of data
-        soup = BeautifulSoup(self.ene_slrs_xml, 'xml')
-        data = soup.find_all('REPORT_DATA')
+        data = self.c.parse_oasis_xml(self.ene_slrs_xml)
 
         # parse
         self.c.handle_options(data='trade', market=self.c.MARKET_CHOICES.dam, freq=self.c.FREQUENCY_CHOICES.dam)
@@ -148,20 +282,24 @@ class TestCAISOBase(TestCase):
 
     def test_parse_oasis_renewables_dam(self):
         # set up list of data
-        soup = BeautifulSoup(self.sld_ren_fcst_xml, 'xml')
-        data = soup.find_all('REPORT_DATA')
+        data = self.c.parse_oasis_xml(self.sld_ren_fcst_xml)
 
         # parse
         self.c.handle_options(data='gen', market=self.c.MARKET_CHOICES.dam, freq=self.c.FREQUENCY_CHOICES.dam)
         parsed_data = self.c.parse_oasis_renewable(data)
 
-        # test
+        # test, data points are in time order
         self.assertEqual(len(parsed_data), 6)
+        expected = {'ba_name': 'CAISO',
+                    'timestamp': datetime(2013, 9, 19, 7, 0, tzinfo=pytz.utc),
+                    'freq': '1hr', 'market': 'DAHR', 'fuel_name': 'wind',
+                    'gen_MW': 478.86}
+        self.assertEqual(expected, parsed_data[0])
         expected = {'ba_name': 'CAISO',
                     'timestamp': datetime(2013, 9, 20, 6, 0, tzinfo=pytz.utc),
                     'freq': '1hr', 'market': 'DAHR', 'fuel_name': 'wind',
                     'gen_MW': 580.83}
-        self.assertEqual(expected, parsed_data[0])
+        self.assertEqual(expected, parsed_data[-2])
 
     @requests_mock.Mocker()
     def test_get_generation_dst_start(self, mock_request):
@@ -227,3 +365,24 @@ class TestCAISOBase(TestCase):
 
         self.assertEqual(generation[0]['timestamp'], Timestamp('2017-11-06T08:00:00Z'))  # '2017-11-06T00:00:00-08:00'
         self.assertEqual(generation[239]['timestamp'], Timestamp('2017-11-07T07:00:00Z'))  # '2017-11-06T23:00:00-08:00'
+
+    @requests_mock.Mocker()
+    def test_get_generation_multiple_days(self, mock_request):
+        for day in ['20171104', '20171106']:
+            expected_url = 'http://content.caiso.com/green/renewrpt/%s_DailyRenewablesWatch.txt' % day
+            expected_response = read_fixture(self.c.__module__, '%s_DailyRenewablesWatch.txt' % day).encode('utf-8')
+            mock_request.get(expected_url, content=expected_response)
+        # a missing day file is skipped
+        mock_request.get('http://content.caiso.com/green/renewrpt/20171105_DailyRenewablesWatch.txt', status_code=404)
+
+        start_at = parse('2017-11-04T00:00:00-07:00')
+        end_at = parse('2017-11-06T23:59:59-08:00')
+        generation = self.c.get_generation(start_at=start_at, end_at=end_at,
+                                           market=self.c.MARKET_CHOICES.hourly, freq=self.c.FREQUENCY_CHOICES.hourly)
+
+        # every day file requested once, results merged in date order
+        self.assertEqual(mock_request.call_count, 3)
+        self.assertEqual(len(generation), 480)
+        self.assertEqual(generation[0]['timestamp'], Timestamp('2017-11-04T07:00:00Z'))
+        self.assertEqual(generation[240]['timestamp'], Timestamp('2017-11-06T08:00:00Z'))
+        self.assertEqual(generation[-1]['timestamp'], Timestamp('2017-11-07T07:00:00Z'))
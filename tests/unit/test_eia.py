@@ -1,3 +1,4 @@
+import json
 import random
 from datetime import datetime, timedelta
 from os import environ
@@ -93,3 +94,66 @@ class TestEIALoad(TestEIA):
 class TestEIATrade(TestEIA):
     def test_null_response(self):
         self._run_null_response_test(self.BALists.us_bas[0], data_type="trade", latest=True)
+
+
+class TestEIAMany(TestEIA):
+    def test_get_many_batches_series(self):
+        def series(series_id):
+            return {'series_id': series_id, 'data': [['20171122T06Z', 100], ['20171122T05Z', None]]}
+
+        response = mock.Mock(text=json.dumps({'request': {}, 'series': [series('EBA.ERCO-ALL.D.H'),
+                                                                        series('EBA.CISO-ALL.D.H')]}))
+        with mock.patch.object(self.c, 'request', return_value=response) as mock_request:
+            df = self.c.get_many(['CISO', 'ERCO', 'IESO'], data_types=['load'], latest=True)
+
+        # one request for both supported BAs; IESO is skipped
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertIn('series_id=EBA.CISO-ALL.D.H;EBA.ERCO-ALL.D.H', mock_request.call_args[0][0])
+        # num=1 would only apply to the first series, so the request is bounded by time instead
+        self.assertIn('&start=', mock_request.call_args[0][0])
+        self.assertEqual(df['ba_name'].dtype.name, 'category')
+        self.assertEqual(list(df['ba_name']), ['CISO', 'ERCO'])
+        self.assertEqual(list(df['load_MW']), [100, 100])
+        self.assertEqual(list(df['timestamp']), [datetime(2017, 11, 22, 6, tzinfo=pytz.utc)] * 2)
+
+
+class TestEIAFormat(TestEIA):
+    def test_format_result_start_end(self):
+        self.c.set_ba('CISO')
+        start_at = datetime(2017, 11, 22, 4, tzinfo=pytz.utc)
+        self.c.handle_options(data='load', start_at=start_at, end_at=start_at + timedelta(hours=2))
+        data = {'series': [{'series_id': 'EBA.CISO-ALL.D.H',
+                            'data': [['20171122T%02dZ' % hour, hour * 100] for hour in range(10, 0, -1)]}]}
+
+        formatted = self.c.format_result(data)
+
+        self.assertEqual([d['timestamp'].hour for d in formatted], [6, 5, 4])
+        self.assertEqual([d['load_MW'] for d in formatted], [600, 500, 400])
+        self.assertEqual(formatted[0]['ba_name'], 'CISO')
+
+    def test_format_url_window(self):
+        self.c.set_ba('CISO')
+        start_at = datetime(2017, 11, 22, 4, tzinfo=pytz.utc)
+        self.c.handle_options(data='load', start_at=start_at, end_at=start_at + timedelta(hours=2))
+        self.c.format_url()
+        self.assertIn('series_id=EBA.CISO-ALL.D.H&start=20171122T04Z&end=20171122T06Z', self.c.url)
+
+    def test_incremental(self):
+        self.c.set_ba('CISO')
+
+        def response(hours):
+            return mock.Mock(text=json.dumps({'request': {}, 'series': [
+                {'series_id': 'EBA.CISO-ALL.D.H', 'data': [['20171122T%02dZ' % hour, 100] for hour in hours]}]}))
+
+        with mock.patch.object(self.c, 'request') as mock_request:
+            mock_request.return_value = response([5, 4])
+            first = self.c.get_load(incremental=True)
+            self.assertNotIn('&start=', mock_request.call_args[0][0])
+
+            mock_request.return_value = response([7, 6, 5])
+            second = self.c.get_load(incremental=True)
+            self.assertIn('&start=20171122T06Z', mock_request.call_args[0][0])
+
+        self.assertEqual([d['timestamp'].hour for d in first], [5, 4])
+        self.assertEqual([d['timestamp'].hour for d in second], [7, 6])
+        self.assertEqual(self.c.high_water_marks['EBA.CISO-ALL.D.H'], datetime(2017, 11, 22, 7, tzinfo=pytz.utc))
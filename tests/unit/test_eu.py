@@ -3,7 +3,8 @@ from pyiso import client_factory
 from unittest import TestCase
 import mock
 from mock import patch
-from datetime import timedelta
+from datetime import datetime, timedelta
+import pytz
 
 fixtures_base_path = os.path.join(os.path.dirname(__file__), '../fixtures/eu')
 
@@ -32,3 +33,85 @@ class TestEU(TestCase):
           self.assertEqual(parsed[-1]['gen_MW'], 3816)
           self.assertEqual(parsed[-1]['fuel_name'], 'nuclear')
 
+
+    def test_fetch_entsoe_windows(self):
+        start_at = datetime(2015, 1, 1, tzinfo=pytz.utc)
+        self.c.handle_options(start_at=start_at, end_at=start_at + timedelta(days=400),
+                              control_area='DE(TenneT GER)', data='load')
+        with patch.object(self.c, 'request') as mock_request:
+            mock_request.return_value = mock.Mock(text='<xml/>')
+            responses = self.c.fetch_entsoe_windows()
+
+        self.assertEqual(responses, [b'<xml/>', b'<xml/>'])
+        periods = sorted((call[1]['params']['periodStart'], call[1]['params']['periodEnd'])
+                         for call in mock_request.call_args_list)
+        self.assertEqual(periods, [('201501010000', '201601010000'), ('201601010000', '201602050000')])
+
+    def test_fetch_entsoe_windows_zero_length(self):
+        start_at = datetime(2015, 1, 1, tzinfo=pytz.utc)
+        self.c.handle_options(control_area='DE(TenneT GER)', data='load')
+        self.c.options.update(start_at=start_at, end_at=start_at)
+        with patch.object(self.c, 'request') as mock_request:
+            mock_request.return_value = mock.Mock(text='<xml/>')
+            responses = self.c.fetch_entsoe_windows()
+
+        self.assertEqual(responses, [b'<xml/>'])
+        self.assertEqual(mock_request.call_count, 1)
+
+    def test_parse_windows_drops_repeated_points(self):
+        self.c.handle_options(start_at=datetime(2017, 10, 29, 20, tzinfo=pytz.utc),
+                              end_at=datetime(2017, 10, 30, tzinfo=pytz.utc),
+                              control_area='DE(TenneT GER)', data='load')
+        with open(os.path.join(fixtures_base_path, 'de_load.xml'), 'r') as report:
+            response = report.read().encode('ascii')
+        parsed = self.c.parse_response(response)
+        self.assertEqual(self.c.parse_windows([response, None, response]), parsed)
+
+    def test_parse_windows_keeps_fuels_sharing_a_name(self):
+        self.c.handle_options(start_at=datetime(2017, 10, 29, 20, tzinfo=pytz.utc),
+                              end_at=datetime(2017, 10, 30, tzinfo=pytz.utc),
+                              control_area='DE(TenneT GER)', data='gen')
+        with open(os.path.join(fixtures_base_path, 'de_gen.xml'), 'r') as report:
+            response = report.read().encode('ascii')
+        parsed = self.c.parse_response(response)
+        self.assertEqual(self.c.parse_windows([response]), parsed)
+        self.assertEqual(self.c.parse_windows([response, response]), parsed)
+
+    def test_get_many(self):
+        with open(os.path.join(fixtures_base_path, 'de_load.xml'), 'r') as report:
+            response = report.read().encode('ascii')
+        areas = ['DE(TenneT GER)', 'DE(Amprion)', 'not-a-cta']
+        with patch.object(self.c, 'fetch_entsoe', return_value=response) as mock_fetch:
+            df = self.c.get_many(areas, data_types=['load'], start_at=datetime(2017, 10, 29, 20, tzinfo=pytz.utc),
+                                 end_at=datetime(2017, 10, 30, tzinfo=pytz.utc))
+
+        self.assertEqual(mock_fetch.call_count, 2)
+        self.assertEqual(df['ba_name'].dtype.name, 'category')
+        self.assertEqual(sorted(df['ba_name'].unique()), ['DE(Amprion)', 'DE(TenneT GER)'])
+        self.assertEqual(len(df[df['ba_name'] == 'DE(Amprion)']), len(df) // 2)
+
+    def test_parse_response_as_frame(self):
+        self.c.handle_options(start_at=datetime(2017, 10, 29, 20, tzinfo=pytz.utc),
+                              end_at=datetime(2017, 10, 30, tzinfo=pytz.utc),
+                              control_area='DE(TenneT GER)', data='gen')
+        with open(os.path.join(fixtures_base_path, 'de_gen.xml'), 'r') as report:
+            response = report.read().encode('ascii')
+        parsed = self.c.parse_response(response)
+
+        self.c.options['as_frame'] = True
+        df = self.c.parse_windows([response])
+        self.assertEqual(df['fuel_name'].dtype.name, 'category')
+        self.assertEqual(df.to_dict(orient='records'), parsed)
+
+    def test_parse_load_period(self):
+        self.c.handle_options(start_at=datetime(2017, 10, 29, 20, tzinfo=pytz.utc),
+                              end_at=datetime(2017, 10, 30, tzinfo=pytz.utc),
+                              control_area='DE(TenneT GER)', data='load')
+        with open(os.path.join(fixtures_base_path, 'de_load.xml'), 'r') as report:
+            parsed = self.c.parse_response(report.read().encode('ascii'))
+
+        # positions count 15 minute intervals from the period start
+        self.assertEqual(len(parsed), 16)
+        self.assertEqual(parsed[0]['timestamp'], datetime(2017, 10, 29, 20, 15, tzinfo=pytz.utc))
+        self.assertEqual(parsed[-1]['timestamp'], datetime(2017, 10, 30, tzinfo=pytz.utc))
+        self.assertEqual(parsed[0]['load_MW'], 16698)
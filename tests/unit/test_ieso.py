@@ -1,8 +1,11 @@
 import os
+import shutil
+import tempfile
 from datetime import datetime
 from datetime import timedelta
 from unittest import TestCase
 
+import mock
 from pytz import timezone
 
 from pyiso import client_factory
@@ -47,6 +50,41 @@ class TestIESO(TestCase):
         self.ieso_client.handle_options(latest=True)
         self.assertTrue(self.ieso_client.options.get('latest', False))
 
+    def test_iter_report_range_yields_each_report(self):
+        range_start = self.ieso_client.local_start_of_day - timedelta(days=3)
+        range_end = self.ieso_client.local_start_of_day - timedelta(seconds=1)
+        report_handler = mock.Mock()
+        report_handler.latest_available_datetime.return_value = self.ieso_client.local_now
+        report_handler.datetime_for_next_report_request.side_effect = lambda tz_aware_dt: tz_aware_dt + timedelta(days=1)
+        report_handler.parse_stored_report.return_value = False
+        report_handler.parse_report.side_effect = lambda result_ts, **kwargs: result_ts.append({'n': len(result_ts)})
+
+        with mock.patch.object(self.ieso_client, 'request'):
+            chunks = self.ieso_client._iter_report_range(report_handler=report_handler,
+                                                         parser_format=ParserFormat.load,
+                                                         range_start=range_start, range_end=range_end)
+            self.assertEqual(report_handler.parse_report.call_count, 0)  # nothing is requested until iterated
+            self.assertEqual(list(chunks), [[{'n': 0}]] * 3)
+
+    def test_iter_report_range_keeps_order(self):
+        range_start = self.ieso_client.local_start_of_day - timedelta(days=10)
+        range_end = self.ieso_client.local_start_of_day - timedelta(seconds=1)
+        report_handler = mock.Mock()
+        report_handler.latest_available_datetime.return_value = self.ieso_client.local_now
+        report_handler.datetime_for_next_report_request.side_effect = lambda tz_aware_dt: tz_aware_dt + timedelta(days=1)
+        report_handler.parse_stored_report.return_value = False
+        report_handler.report_url.side_effect = lambda report_datetime: report_datetime.strftime('%Y%m%d')
+        report_handler.parse_report.side_effect = lambda xml_content, result_ts, **kwargs: result_ts.append(xml_content)
+
+        with mock.patch.object(self.ieso_client, 'request') as mock_request:
+            mock_request.side_effect = lambda url, **kwargs: mock.Mock(content=url)
+            chunks = list(self.ieso_client._iter_report_range(report_handler=report_handler,
+                                                              parser_format=ParserFormat.load,
+                                                              range_start=range_start, range_end=range_end))
+
+        expected = [[(range_start + timedelta(days=i)).strftime('%Y%m%d')] for i in range(10)]
+        self.assertEqual(chunks, expected)
+
 
 class TestIntertieScheduleFlowReportHandler(TestCase):
     def setUp(self):
@@ -70,6 +108,15 @@ class TestIntertieScheduleFlowReportHandler(TestCase):
         self.assertEquals(trades[0]['net_exp_MW'], 2269.4)
         self.assertEquals(trades[287]['net_exp_MW'], 2242)
 
+    def test_parse_latest(self):
+        xml_content = open(FIXTURES_DIR + '/full_IntertieScheduleFlow_20170630.xml').read().encode('utf8')
+        trades = list([])
+
+        self.report_handler.parse_latest(xml_content=xml_content, result_ts=trades, parser_format=ParserFormat.trade)
+
+        self.assertEqual(len(trades), 1)
+        self.assertEqual(trades[0]['net_exp_MW'], 2242)
+
     def test_report_url_for_default(self):
         url = self.report_handler.report_url()
         self.assertEquals(url, 'http://reports.ieso.ca/public/IntertieScheduleFlow/PUB_IntertieScheduleFlow.xml')
@@ -319,6 +366,18 @@ class TestGeneratorOutputCapabilityReportHandler(TestCase):
             elif (val['fuel_name'] == 'hydro') & (val['timestamp'].hour == 9):
                 self.assertEquals(val['gen_MW'], 165)
 
+    def test_parse_latest(self):
+        xml_content = open(FIXTURES_DIR + '/reduced_GenOutputCapability_20160501.xml').read().encode('utf8')
+        generation_ts = list([])
+
+        self.report_handler.parse_latest(xml_content=xml_content, result_ts=generation_ts,
+                                         parser_format=ParserFormat.generation)
+
+        self.assertEqual(len(generation_ts), 3)  # latest hour of three fuels
+        self.assertEqual(len(set(val['timestamp'] for val in generation_ts)), 1)
+        gen_by_fuel = dict((val['fuel_name'], val['gen_MW']) for val in generation_ts)
+        self.assertEqual(gen_by_fuel['nuclear'], 678)
+
     def test_report_url_for_default(self):
         url = self.report_handler.report_url()
         self.assertEquals(url, 'http://reports.ieso.ca/public/GenOutputCapability/PUB_GenOutputCapability.xml')
@@ -367,6 +426,30 @@ class TestGeneratorOutputByFuelHourlyReportHandler(TestCase):
             elif (val['fuel_name'] == 'hydro') & (val['timestamp'].day == 8) & (val['timestamp'].hour == 5):
                 self.assertEquals(val['gen_MW'], 4749)
 
+    def test_parse_stored_report(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.report_handler.ieso_client.enable_cache(cache_dir)
+
+        start_at = datetime(year=2016, month=1, day=2, hour=1, minute=0, second=0,
+                            tzinfo=timezone(ieso.IESOClient.TZ_NAME))
+        end_at = datetime(year=2016, month=1, day=3, hour=0, minute=59, second=59,
+                          tzinfo=timezone(ieso.IESOClient.TZ_NAME))
+        xml_content = open(FIXTURES_DIR + '/reduced_GenOutputbyFuelHourly_2016.xml').read().encode('utf8')
+        parsed_ts = list([])
+        self.report_handler.parse_report(xml_content=xml_content, result_ts=parsed_ts,
+                                         parser_format=ParserFormat.generation,
+                                         min_datetime=start_at, max_datetime=end_at)
+
+        # a completed year is read back from the cache directory, without the XML
+        self.report_handler.ieso_client.gen_output_year_tables.clear()
+        stored_ts = list([])
+        self.assertTrue(self.report_handler.parse_stored_report(report_datetime=start_at, result_ts=stored_ts,
+                                                                parser_format=ParserFormat.generation,
+                                                                min_datetime=start_at, max_datetime=end_at))
+        self.assertEqual(len(stored_ts), 144)  # 6 fuels * 24 hours
+        self.assertEqual(stored_ts, parsed_ts)
+
     def test_report_url_for_default(self):
         url = self.report_handler.report_url()
         self.assertEquals(url, 'http://reports.ieso.ca/public/GenOutputbyFuelHourly/PUB_GenOutputbyFuelHourly.xml')
@@ -2,6 +2,7 @@ from os import environ, path
 from pyiso import client_factory
 from unittest import TestCase
 from datetime import datetime
+import json
 import requests_mock
 import pytz
 
@@ -126,3 +127,52 @@ class TestISONE(TestCase):
 
     def test_get_sevendayforecast_bad_date(self):
         self.assertRaises(ValueError, self.c.get_sevendayforecast, day="foo")
+
+    @requests_mock.Mocker()
+    def test_get_generation_concurrent_days(self, mock_request):
+        base_url = 'https://webservices.iso-ne.com/api/v1.1/genfuelmix/day/'
+        # each day reports a different fuel
+        for day, fuel in [('20160502', 'Wind'), ('20160503', 'Solar')]:
+            records = [{'BeginDate': '%s-%s-%sT%02d:00:00.000-04:00' % (day[:4], day[4:6], day[6:], hour),
+                        'GenMw': 100 + hour, 'FuelCategory': fuel, 'FuelCategoryRollup': 'Renewables',
+                        'MarginalFlag': 'N'} for hour in range(24)]
+            mock_request.get(base_url + day + '.json',
+                             text=json.dumps({'GenFuelMixes': {'GenFuelMix': records}}))
+        mock_request.get(base_url + '20160504.json', status_code=404)
+
+        data = self.c.get_generation(start_at=pytz.utc.localize(datetime(2016, 5, 2, 12)),
+                                     end_at=pytz.utc.localize(datetime(2016, 5, 4, 12)))
+
+        # every day is requested once over the authenticated session, and results stay in order
+        self.assertEqual(len(mock_request.request_history), 3)
+        for request in mock_request.request_history:
+            self.assertIn('Authorization', request.headers)
+        timestamps = [d['timestamp'] for d in data]
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertEqual(timestamps[0], pytz.utc.localize(datetime(2016, 5, 2, 12)))
+        self.assertEqual(timestamps[-1], pytz.utc.localize(datetime(2016, 5, 4, 3)))
+        self.assertEqual(set(d['fuel_name'] for d in data), set(['wind', 'solar']))
+
+    def test_parse_json_gen(self):
+        self.c.handle_options(data='gen', latest=True)
+        records = [
+            {'BeginDate': '2016-11-06T01:00:00.000-04:00', 'GenMw': 10, 'FuelCategory': 'Wood',
+             'FuelCategoryRollup': 'Renewables', 'MarginalFlag': 'N'},
+            {'BeginDate': '2016-11-06T01:00:00.000-05:00', 'GenMw': 20, 'FuelCategory': 'Natural Gas',
+             'FuelCategoryRollup': 'Natural Gas', 'MarginalFlag': 'Y'},
+            {'BeginDate': '2016-11-06T01:00:00.000-05:00', 'GenMw': 30, 'FuelCategory': 'Wood',
+             'FuelCategoryRollup': 'Renewables', 'MarginalFlag': 'N'},
+        ]
+        df = self.c._parse_json(records)
+
+        # unneeded fields are never turned into columns
+        self.assertEqual(sorted(df.columns), ['ba_name', 'freq', 'fuel_name', 'gen_MW', 'market', 'timestamp'])
+        self.assertEqual(list(df['fuel_name']), ['biomass', 'natgas', 'biomass'])
+        self.assertEqual(list(df['gen_MW']), [10, 20, 30])
+        self.assertEqual(list(df.index), [pytz.utc.localize(datetime(2016, 11, 6, 5)),
+                                          pytz.utc.localize(datetime(2016, 11, 6, 6)),
+                                          pytz.utc.localize(datetime(2016, 11, 6, 6))])
+
+    def test_parse_json_load_missing_field(self):
+        self.c.handle_options(data='load', latest=True)
+        self.assertRaises(ValueError, self.c._parse_json, [{'BeginDate': '2016-11-06T01:00:00.000-04:00'}])
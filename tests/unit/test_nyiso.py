@@ -1,6 +1,11 @@
+import zipfile
+from io import BytesIO
 from pyiso import client_factory
 from unittest import TestCase
-from datetime import date
+from datetime import date, datetime
+import mock
+import pytz
+import requests_mock
 
 from tests import read_fixture
 
@@ -66,3 +71,47 @@ class TestNYISOBase(TestCase):
             self.assertLess(row['gen_MW'], 5500)
             self.assertIn(row['fuel_name'], self.c.fuel_names.values())
         self.assertEqual(df.index.name, 'timestamp')
+
+    def test_parse_timestamps(self):
+        parsed = self.c.parse_timestamps(['11/22/2017 00:05:00', '11/22/2017 00:05:00', '11/22/2017 00:10:00'])
+        self.assertEqual(list(parsed), [datetime(2017, 11, 22, 0, 5), datetime(2017, 11, 22, 0, 5),
+                                        datetime(2017, 11, 22, 0, 10)])
+
+        legacy = self.c.parse_timestamps(['01/19/2016 00:05'])
+        self.assertEqual(list(legacy), [datetime(2016, 1, 19, 0, 5)])
+
+    def _zip(self, names):
+        content = BytesIO()
+        z = zipfile.ZipFile(content, 'w')
+        for name in names:
+            z.writestr(name, name)
+        z.close()
+        return content.getvalue()
+
+    @requests_mock.Mocker()
+    def test_fetch_csvs_for_dates(self, mock_request):
+        url = 'http://mis.nyiso.com/public/csv/rtfuelmix/'
+        mock_request.get(url + '20171001rtfuelmix_csv.zip',
+                         content=self._zip(['20171030rtfuelmix.csv', '20171031rtfuelmix.csv']))
+        mock_request.get(url + '20171030rtfuelmix.csv', text='20171030 daily')
+        mock_request.get(url + '20171101rtfuelmix_csv.zip',
+                         content=self._zip(['20171101rtfuelmix.csv', '20171102rtfuelmix.csv']))
+        mock_request.get(url + '20171201rtfuelmix.csv', text='20171201 daily')
+        mock_request.get(url + '20171202rtfuelmix.csv', status_code=404)
+        mock_request.get(url + '20171201rtfuelmix_csv.zip', content=self._zip(['20171202rtfuelmix.csv']))
+
+        self.c.options = {'data': 'gen'}
+        self.c.monthly_archive_min_dates = 2
+        dates = [date(2017, 10, 30), date(2017, 11, 1), date(2017, 11, 2), date(2017, 12, 1), date(2017, 12, 2)]
+        with mock.patch.object(self.c, 'local_now', return_value=datetime(2017, 12, 5, tzinfo=pytz.utc)):
+            csvs = self.c.fetch_csvs_for_dates(dates, 'rtfuelmix')
+
+        # each archive is requested once, and only members inside the range are kept
+        self.assertEqual(csvs, ['20171030 daily', b'20171101rtfuelmix.csv', b'20171102rtfuelmix.csv',
+                                '20171201 daily', b'20171202rtfuelmix.csv'])
+        requested = [r.url for r in mock_request.request_history]
+        self.assertEqual(len(requested), len(set(requested)))
+
+        # a single date in a past month comes from its daily csv, a fuller month from its archive
+        self.assertNotIn(url + '20171001rtfuelmix_csv.zip', requested)
+        self.assertNotIn(url + '20171101rtfuelmix.csv', requested)